@@ -0,0 +1,474 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+import tempfile
+import multiprocessing
+import numpy as np
+import networkx as nx
+
+import grafo_final as gf
+
+# Benchmark das verificações de grafo_final.py sobre grafos sintéticos gerados com semente fixa.
+# Cada verificação roda em um processo filho (fork) com o grafo já montado: o tempo é medido sem
+# estruturas em cache, o pico de memória é do próprio filho e um tempo limite pode encerrá-lo.
+# As respostas são comparadas com o networkx (ou com o valor conhecido pela construção do grafo)
+# e o relatório sai em JSON, para comparar execuções com --comparar.
+
+TAMANHOS_PADRAO = [10, 100, 1000, 10 ** 4, 10 ** 5]
+# Grau médio dos geradores aleatórios esparsos (G(n,p), lei de potência, bipartido)
+GRAU_MEDIO_PADRAO = 4
+# Expoente da distribuição de graus do gerador de lei de potência
+EXPOENTE_POTENCIA = 2.5
+# O grafo completo tem n(n-1)/2 arestas; acima disto ele não é gerado
+LIMITE_COMPLETO = 3000
+# Até quantos vértices as respostas são conferidas com o networkx
+LIMITE_REFERENCIA = 10 ** 5
+# Tempo limite padrão de cada verificação, em segundos
+TEMPO_LIMITE_PADRAO = 120.0
+# Relatório padrão fica no diretório temporário, fora da árvore do repositório
+SAIDA_PADRAO = os.path.join(tempfile.gettempdir(), 'benchmark_grafo.json')
+
+
+# Geradores: cada um devolve (n, origens, destinos) com ids inteiros; arestas repetidas e laços
+# são removidos por GrafoCompacto.de_arestas / pelo próprio gerador.
+
+def gerar_caminho(n, gerador, grau_medio):
+    origens = np.arange(n - 1, dtype=np.int64)
+    return n, origens, origens + 1
+
+# Árvore aleatória recursiva: o pai do vértice i é sorteado entre 0..i-1
+def gerar_arvore(n, gerador, grau_medio):
+    filhos = np.arange(1, n, dtype=np.int64)
+    return n, gerador.integers(0, filhos), filhos
+
+# Grade r x c com r = floor(sqrt(n)); o número de vértices fica r * (n // r)
+def gerar_grade(n, gerador, grau_medio):
+    linhas = max(1, int(np.sqrt(n)))
+    colunas = n // linhas
+    ids = np.arange(linhas * colunas, dtype=np.int64).reshape(linhas, colunas)
+    origens = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    destinos = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    return linhas * colunas, origens, destinos
+
+# G(n,p) com p = grau_medio / (n - 1). Até LIMITE_COMPLETO vértices sorteia cada par; acima disso
+# sorteia a quantidade binomial de arestas e os pares com reposição (as repetições, raras em grafos
+# esparsos, são descartadas), o que evita a matriz n x n.
+def gerar_gnp(n, gerador, grau_medio):
+    p = min(1.0, grau_medio / max(n - 1, 1))
+    if n <= LIMITE_COMPLETO:
+        origens, destinos = np.triu_indices(n, 1)
+        escolhidas = gerador.random(len(origens)) < p
+        return n, origens[escolhidas], destinos[escolhidas]
+    m = gerador.binomial(n * (n - 1) // 2, p)
+    origens = gerador.integers(0, n, m)
+    destinos = gerador.integers(0, n, m)
+    comum = origens != destinos
+    return n, origens[comum], destinos[comum]
+
+# Modelo de Chung-Lu: os extremos de cada aresta são sorteados com probabilidade proporcional a
+# um peso i^(-1/(expoente-1)), o que dá uma distribuição de graus em lei de potência
+def gerar_potencia(n, gerador, grau_medio):
+    pesos = np.arange(1, n + 1, dtype=np.float64) ** (-1.0 / (EXPOENTE_POTENCIA - 1))
+    pesos /= pesos.sum()
+    m = grau_medio * n // 2
+    origens = gerador.choice(n, m, p=pesos)
+    destinos = gerador.choice(n, m, p=pesos)
+    comum = origens != destinos
+    return n, origens[comum], destinos[comum]
+
+def gerar_completo(n, gerador, grau_medio):
+    if n > LIMITE_COMPLETO:
+        return None
+    origens, destinos = np.triu_indices(n, 1)
+    return n, origens, destinos
+
+# Bipartido aleatório: metade dos vértices de cada lado, arestas sorteadas só entre os lados
+def gerar_bipartido(n, gerador, grau_medio):
+    metade = n // 2
+    m = grau_medio * n // 2 if metade else 0
+    origens = gerador.integers(0, max(metade, 1), m)
+    destinos = gerador.integers(metade, n, m)
+    return n, origens, destinos
+
+GERADORES = {
+    'caminho': gerar_caminho,
+    'arvore': gerar_arvore,
+    'grade': gerar_grade,
+    'gnp': gerar_gnp,
+    'potencia': gerar_potencia,
+    'completo': gerar_completo,
+    'bipartido': gerar_bipartido,
+}
+
+# Monta o GrafoCompacto do gerador com uma semente própria para cada (gerador, tamanho)
+def gerar_grafo(nome, n, semente, grau_medio=GRAU_MEDIO_PADRAO):
+    gerador = np.random.default_rng([semente, n, list(GERADORES).index(nome)])
+    arestas = GERADORES[nome](n, gerador, grau_medio)
+    if arestas is None:
+        return None
+    n, origens, destinos = arestas
+    return gf.GrafoCompacto.de_arestas([str(v) for v in range(n)], origens, destinos)
+
+
+def _cromatico_provado(cromatico):
+    return cromatico['limite_superior'] if cromatico['provado'] else None
+
+# Pontes, pontos de articulação e blocos, como contagens
+def _contagens_estrutura(estrutura):
+    return [len(estrutura.pontes), len(estrutura.articulacoes), len(estrutura.blocos)]
+
+# Verificações medidas: nome -> função que recebe o GrafoCompacto e devolve um valor simples
+VERIFICACOES = {
+    'verifica_conexo': gf.verifica_conexo,
+    'verifica_ciclo': gf.verifica_ciclo,
+    'is_bipartite': gf.is_bipartite,
+    'is_tree': gf.is_tree,
+    'is_eulerian': gf.is_eulerian,
+    'is_completo': gf.is_completo,
+    # As buscas exatas param no prazo; nesse caso o resultado fica None (não decidido) em vez do
+    # limite superior / False que calcular_numero_cromatico e is_hamiltonian devolveriam
+    'calcular_numero_cromatico': lambda g: _cromatico_provado(gf.calcular_coloracao_exata(g)),
+    'is_hamiltonian': lambda g: gf.buscar_ciclo_hamiltoniano(g)['hamiltoniano'],
+    'verificar_planaridade': lambda g: gf.verificar_planaridade(g)['planar'],
+    'indice_estrutural': lambda g: _contagens_estrutura(gf.indice_estrutural(g)),
+}
+
+# Respostas de referência do networkx para as verificações que ele sabe responder
+def _euleriano_referencia(grafo):
+    com_arestas = grafo.subgraph([v for v in grafo if grafo.degree(v) > 0])
+    if not com_arestas.number_of_nodes():
+        return grafo.number_of_nodes() > 0
+    return nx.is_eulerian(com_arestas)
+
+REFERENCIAS = {
+    'verifica_conexo': nx.is_connected,
+    'verifica_ciclo': lambda grafo: not nx.is_forest(grafo),
+    'is_bipartite': nx.is_bipartite,
+    'is_tree': nx.is_tree,
+    'is_eulerian': _euleriano_referencia,
+    'is_completo': lambda grafo: (grafo.number_of_edges() - nx.number_of_selfloops(grafo)
+                                  == grafo.number_of_nodes() * (grafo.number_of_nodes() - 1) // 2),
+    'verificar_planaridade': lambda grafo: nx.check_planarity(grafo)[0],
+    'indice_estrutural': lambda grafo: [sum(1 for _ in nx.bridges(grafo)),
+                                        sum(1 for _ in nx.articulation_points(grafo)),
+                                        sum(1 for _ in nx.biconnected_components(grafo))],
+}
+
+# Número cromático e hamiltonicidade não têm referência no networkx; quando a construção do grafo
+# determina a resposta, ela é usada (None = desconhecida)
+def resposta_conhecida(nome_gerador, verificacao, g):
+    n = g.number_of_nodes()
+    m = g.number_of_edges()
+    if verificacao == 'calcular_numero_cromatico':
+        if m == 0:
+            return 1
+        if nome_gerador in ('caminho', 'arvore', 'grade', 'bipartido'):
+            return 2
+        if nome_gerador == 'completo':
+            return n
+    elif verificacao == 'is_hamiltonian' and n >= 3:
+        if nome_gerador in ('caminho', 'arvore'):
+            return False
+        if nome_gerador == 'completo':
+            return True
+        if nome_gerador == 'grade':
+            linhas = max(1, int(np.sqrt(n)))
+            # Uma grade tem ciclo hamiltoniano se tiver 2+ linhas e colunas e um número par de vértices
+            return linhas >= 2 and n // linhas >= 2 and n % 2 == 0
+    return None
+
+
+# Corpo do processo filho: roda a verificação e manda de volta resultado, tempo e memória
+def _executar_no_filho(conexao, funcao, argumento):
+    # Sem cache: cada medida é feita a frio
+    gf.configurar_cache(0)
+    memoria_inicial = gf.pico_memoria_mb()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao(argumento)
+        erro = None
+    except Exception as e:
+        resultado = None
+        erro = f"{type(e).__name__}: {e}"
+    segundos = time.perf_counter() - inicio
+    pico = gf.pico_memoria_mb()
+    conexao.send({'resultado': resultado, 'erro': erro, 'segundos': segundos,
+                  'pico_mb': pico, 'memoria_extra_mb': pico - memoria_inicial})
+    conexao.close()
+
+# Executa funcao(argumento) em um processo filho com tempo limite
+def medir(funcao, argumento, tempo_limite):
+    contexto = multiprocessing.get_context('fork')
+    recebe, envia = contexto.Pipe(duplex=False)
+    processo = contexto.Process(target=_executar_no_filho, args=(envia, funcao, argumento))
+    processo.start()
+    envia.close()
+    if recebe.poll(tempo_limite):
+        try:
+            medida = recebe.recv()
+        except EOFError:
+            medida = {'erro': "processo encerrado sem resposta"}
+    else:
+        processo.kill()
+        medida = {'erro': f"tempo limite de {tempo_limite} s esgotado"}
+    processo.join()
+    if processo.exitcode not in (0, None) and 'segundos' not in medida:
+        medida['erro'] = medida.get('erro') or f"processo terminou com código {processo.exitcode}"
+    return medida
+
+# Converte valores do NumPy para tipos do JSON
+def _simples(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+# Carregadores: grava o grafo em CSV e em snapshot e mede a leitura de cada um
+def _carregar_csv(arquivo):
+    grafo, _ = gf.carregar_arestas(arquivo)
+    return [grafo.number_of_nodes(), grafo.number_of_edges()]
+
+def _abrir_snapshot(arquivo):
+    grafo = gf.abrir_snapshot(arquivo)
+    return [grafo.number_of_nodes(), grafo.number_of_edges()]
+
+def medir_carregadores(g, diretorio, tempo_limite):
+    arquivo_csv = os.path.join(diretorio, 'grafo.csv')
+    with open(arquivo_csv, 'w') as file:
+        for origem, destino, peso in g.arestas():
+            file.write(f"{origem},{destino},{peso}\n")
+    arquivo_snapshot = os.path.join(diretorio, 'grafo.grafo')
+    gf.salvar_snapshot(g, arquivo_snapshot)
+    # O arquivo de arestas não guarda vértices isolados; o snapshot guarda todos
+    com_arestas = int(np.count_nonzero(g.graus()))
+    medidas = {
+        'carregar_arestas': (medir(_carregar_csv, arquivo_csv, tempo_limite),
+                             [com_arestas, g.number_of_edges()]),
+        'abrir_snapshot': (medir(_abrir_snapshot, arquivo_snapshot, tempo_limite),
+                           [g.number_of_nodes(), g.number_of_edges()]),
+    }
+    os.remove(arquivo_csv)
+    os.remove(arquivo_snapshot)
+    return medidas
+
+
+# Roda todas as verificações pedidas sobre todos os geradores e tamanhos; cada medida vira um
+# registro do relatório e uma linha na saída padrão assim que termina
+def executar(geradores, tamanhos, verificacoes, semente, tempo_limite, grau_medio,
+             limite_referencia, carregadores=True):
+    registros = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in geradores:
+            for tamanho in tamanhos:
+                inicio = time.perf_counter()
+                g = gerar_grafo(nome, tamanho, semente, grau_medio)
+                if g is None:
+                    continue
+                geracao = time.perf_counter() - inicio
+                base = {'gerador': nome, 'tamanho': tamanho, 'vertices': g.number_of_nodes(),
+                        'arestas': g.number_of_edges(), 'geracao_s': round(geracao, 6)}
+                referencia = None
+                if g.number_of_nodes() <= limite_referencia:
+                    referencia = g.para_networkx()
+
+                medidas = {}
+                for verificacao in verificacoes:
+                    esperado = resposta_conhecida(nome, verificacao, g)
+                    if esperado is None and referencia is not None and verificacao in REFERENCIAS:
+                        esperado = REFERENCIAS[verificacao](referencia)
+                    medidas[verificacao] = (medir(VERIFICACOES[verificacao], g, tempo_limite), esperado)
+                if carregadores:
+                    medidas.update(medir_carregadores(g, diretorio, tempo_limite))
+
+                for verificacao, (medida, esperado) in medidas.items():
+                    registro = dict(base, verificacao=verificacao)
+                    registro['segundos'] = round(medida['segundos'], 6) if 'segundos' in medida else None
+                    registro['pico_mb'] = medida.get('pico_mb')
+                    registro['memoria_extra_mb'] = medida.get('memoria_extra_mb')
+                    registro['resultado'] = _simples(medida.get('resultado'))
+                    registro['esperado'] = _simples(esperado)
+                    # confere: True/False quando há resposta esperada, None quando não há
+                    if medida.get('erro') or esperado is None:
+                        registro['confere'] = None
+                    else:
+                        registro['confere'] = registro['resultado'] == registro['esperado']
+                    if medida.get('erro'):
+                        registro['erro'] = medida['erro']
+                    registros.append(registro)
+                    exibir_registro(registro)
+    return registros
+
+def exibir_registro(registro):
+    segundos = "-" if registro['segundos'] is None else f"{registro['segundos']:.4f}s"
+    memoria = "-" if registro['memoria_extra_mb'] is None else f"+{registro['memoria_extra_mb']:.1f}MB"
+    confere = {True: "ok", False: "DIVERGE", None: ""}[registro['confere']]
+    print(f"{registro['gerador']:10} {registro['vertices']:>9} {registro['verificacao']:26} "
+          f"{segundos:>12} {memoria:>10} {confere} {registro.get('erro', '')}".rstrip(), flush=True)
+
+# Compara o relatório atual com um anterior: razão de tempo para cada medida presente nos dois
+def comparar(registros, anterior):
+    chaves = {(r['gerador'], r['tamanho'], r['verificacao']): r for r in anterior['registros']}
+    print("\nComparação com o relatório anterior (tempo atual / anterior):")
+    for registro in registros:
+        antigo = chaves.get((registro['gerador'], registro['tamanho'], registro['verificacao']))
+        if antigo is None or not antigo['segundos'] or registro['segundos'] is None:
+            continue
+        razao = registro['segundos'] / antigo['segundos']
+        print(f"{registro['gerador']:10} {registro['vertices']:>9} {registro['verificacao']:26} "
+              f"{razao:8.2f}x")
+
+# Regressões: casos pequenos e fixos que já deram resposta errada. Cada uma devolve None quando
+# passa ou a descrição do problema; rodam com --regressoes, sem medir tempo.
+
+# Um ciclo devolvido como hamiltoniano tem de passar por todos os vértices usando arestas do grafo
+def _ciclo_confere(grafo, ciclo):
+    n = grafo.number_of_nodes()
+    return (len(ciclo) == n == len(set(ciclo))
+            and all(grafo.has_edge(ciclo[i], ciclo[(i + 1) % n]) for i in range(n)))
+
+# Força bruta sobre as permutações (só para grafos minúsculos)
+def _hamiltoniano_bruto(grafo):
+    vertices = list(grafo)
+    if len(vertices) < 3:
+        return False
+    return any(_ciclo_confere(grafo, [vertices[0], *resto])
+               for resto in itertools.permutations(vertices[1:]))
+
+# K4 mais um triângulo pendurado no vértice 0: o vértice 0 é de corte, mas o teste de Ore
+# pulava o par (0, 4) e o algoritmo de Palmer devolvia um "ciclo" com não arestas
+def regressao_ore_corte():
+    grafo = nx.complete_graph(4)
+    grafo.add_edges_from([(0, 4), (0, 5), (4, 5)])
+    resultado = gf.buscar_ciclo_hamiltoniano(grafo)
+    if resultado['hamiltoniano'] is not False:
+        return f"esperado False, veio {resultado['hamiltoniano']} ({resultado['ciclo']})"
+    return None
+
+# Todos os grafos do atlas do networkx (até 7 vértices) contra a força bruta
+def regressao_atlas_hamiltoniano():
+    for indice, grafo in enumerate(nx.graph_atlas_g()):
+        resultado = gf.buscar_ciclo_hamiltoniano(grafo)
+        if resultado['hamiltoniano'] and not _ciclo_confere(grafo, resultado['ciclo']):
+            return f"atlas {indice}: ciclo inválido {resultado['ciclo']}"
+        if bool(resultado['hamiltoniano']) != _hamiltoniano_bruto(grafo):
+            return f"atlas {indice}: resposta {resultado['hamiltoniano']} diverge da força bruta"
+    return None
+
+# Triângulos com rótulos 1, 2, 3 e '1', '2', '3': a impressão digital usava str(rótulo), então o
+# resultado em cache de um grafo voltava com os rótulos do outro
+def regressao_rotulos_tipados():
+    inteiros = nx.Graph([(1, 2), (2, 3), (3, 1)])
+    textos = nx.Graph([('1', '2'), ('2', '3'), ('3', '1')])
+    if gf.impressao_digital(inteiros) == gf.impressao_digital(textos):
+        return "mesma impressão digital para rótulos 1 e '1'"
+    with tempfile.TemporaryDirectory() as diretorio:
+        gf.configurar_cache(16, diretorio)
+        try:
+            gf.buscar_ciclo_hamiltoniano(textos)
+            ciclo = gf.buscar_ciclo_hamiltoniano(inteiros)['ciclo']
+        finally:
+            gf.configurar_cache(0)
+    if sorted(ciclo, key=str) != [1, 2, 3]:
+        return f"ciclo com os rótulos do outro grafo: {ciclo}"
+    return None
+
+# O mesmo grafo relido com os vértices em outra ordem tem a mesma impressão digital e outros ids:
+# a coloração em cache (lista por id) voltava imprópria para o grafo relido
+def regressao_reordenacao_coloracao():
+    grafo = nx.gnp_random_graph(40, 0.3, seed=1)
+    arestas = [(f"v{u}", f"v{v}") for u, v in grafo.edges()]
+    sorteio = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'grafo.csv')
+        gf.configurar_cache(16)
+        try:
+            for rodada in range(20):
+                # Arestas (e extremos) embaralhados mudam a ordem em que os vértices aparecem
+                with open(arquivo, 'w') as file:
+                    for i in sorteio.permutation(len(arestas)):
+                        u, v = arestas[i] if sorteio.random() < 0.5 else arestas[i][::-1]
+                        file.write(f"{u},{v}\n")
+                relido = gf.para_compacto(gf.carregar_grafo(arquivo))
+                coloracao = gf.calcular_coloracao_exata(relido)['coloracao']
+                indice = {rotulo: v for v, rotulo in enumerate(relido.rotulos)}
+                for u, v in arestas:
+                    if coloracao[indice[u]] == coloracao[indice[v]]:
+                        return f"rodada {rodada}: {u} e {v} com a mesma cor"
+            acertos = gf.cache_propriedades.acertos
+        finally:
+            gf.configurar_cache(0)
+    if not acertos:
+        return "a coloração não voltou do cache"
+    return None
+
+REGRESSOES = {
+    'ore_corte': regressao_ore_corte,
+    'atlas_hamiltoniano': regressao_atlas_hamiltoniano,
+    'rotulos_tipados': regressao_rotulos_tipados,
+    'reordenacao_coloracao': regressao_reordenacao_coloracao,
+}
+
+# Roda as regressões sem cache e devolve quantas falharam
+def executar_regressoes():
+    gf.configurar_cache(0)
+    falhas = 0
+    for nome, regressao in REGRESSOES.items():
+        problema = regressao()
+        falhas += problema is not None
+        print(f"{nome:26} {'ok' if problema is None else 'FALHOU: ' + problema}", flush=True)
+    return falhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das verificações de grafo_final.py.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="quantidades de vértices (padrão: 10 a 10^5; aceita até 10^7)")
+    parser.add_argument('--geradores', nargs='+', choices=list(GERADORES), default=list(GERADORES))
+    parser.add_argument('--verificacoes', nargs='+', choices=list(VERIFICACOES), default=list(VERIFICACOES))
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=TEMPO_LIMITE_PADRAO,
+                        help="tempo limite de cada verificação, em segundos")
+    parser.add_argument('--grau-medio', type=int, default=GRAU_MEDIO_PADRAO)
+    parser.add_argument('--limite-referencia', type=int, default=LIMITE_REFERENCIA,
+                        help="maior grafo conferido com o networkx")
+    parser.add_argument('--sem-carregadores', action='store_true',
+                        help="não mede carregar_arestas e abrir_snapshot")
+    parser.add_argument('--saida', '-o', default=SAIDA_PADRAO,
+                        help=f"arquivo JSON do relatório (padrão: {SAIDA_PADRAO})")
+    parser.add_argument('--comparar', default=None, help="relatório anterior para comparar os tempos")
+    parser.add_argument('--regressoes', action='store_true',
+                        help="só confere os casos de regressão (sem medir tempos nem gerar relatório)")
+    args = parser.parse_args(argv)
+    if args.regressoes:
+        return 1 if executar_regressoes() else 0
+
+    inicio = time.time()
+    registros = executar(args.geradores, args.tamanhos, args.verificacoes, args.semente, args.timeout,
+                         args.grau_medio, args.limite_referencia, not args.sem_carregadores)
+    relatorio = {
+        'inicio': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(inicio)),
+        'segundos': round(time.time() - inicio, 3),
+        'ambiente': {'python': platform.python_version(), 'numpy': np.__version__,
+                     'networkx': nx.__version__, 'plataforma': platform.platform()},
+        'parametros': {'tamanhos': args.tamanhos, 'geradores': args.geradores,
+                       'semente': args.semente, 'grau_medio': args.grau_medio,
+                       'timeout': args.timeout},
+        'registros': registros,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as file:
+        json.dump(relatorio, file, ensure_ascii=False, indent=1)
+    print(f"\nRelatório salvo em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as file:
+            comparar(registros, json.load(file))
+    # Código de saída 1 se alguma resposta divergiu da referência
+    return 1 if any(registro['confere'] is False for registro in registros) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,272 +1,2917 @@
 import os
+import sys
+import argparse
+import json
+import signal
+import pickle
+import hashlib
+import inspect
+import functools
+import threading
+import contextlib
+import cProfile
+import pstats
+import tracemalloc
+import heapq
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pyvis.network import Network
 import networkx as nx
 from networkx.algorithms.planarity import check_planarity
 import csv
+import struct
+import time
+from collections import deque, OrderedDict
+import numpy as np
+
+# Representação compacta de um grafo não direcionado:
+# os rótulos dos vértices são internados em ids inteiros (0..n-1) e a adjacência
+# é guardada no formato CSR (offsets + vizinhos), com um vetor de pesos paralelo aos vizinhos.
+# Os vizinhos do vértice v ficam em vizinhos[offsets[v]:offsets[v + 1]].
+# Cada aresta u-v aparece duas vezes (em u e em v); um laço v-v aparece uma única vez,
+# igual ao que o networkx guarda em grafo[v].
+class GrafoCompacto:
+    def __init__(self, rotulos, offsets, vizinhos, pesos, num_arestas):
+        # Lista id -> rótulo original do vértice
+        self.rotulos = rotulos
+        # Vetores CSR contíguos (necessário para expor memoryviews sem cópia)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        self.vizinhos = np.ascontiguousarray(vizinhos, dtype=np.int64)
+        self.pesos = np.ascontiguousarray(pesos)
+        self.num_arestas = int(num_arestas)
+        # Estruturas derivadas, calculadas somente quando forem pedidas
+        self._indice = None
+        self._graus = None
+        self._lacos = None
+        self._componentes = None
+        self._estrutura = None
+        self._impressao = None
+        self._posto = None
+
+    # Constrói o grafo a partir de vetores de arestas já internadas (ids inteiros)
+    @classmethod
+    def de_arestas(cls, rotulos, origens, destinos, pesos=None):
+        n = len(rotulos)
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        if pesos is None:
+            pesos = np.ones(len(origens), dtype=np.int64)
+        else:
+            pesos = np.asarray(pesos)
+            # Pesos que não são numéricos não cabem em um vetor NumPy compacto
+            if pesos.dtype.kind not in 'iuf':
+                pesos = pesos.astype(np.float64)
+
+        if len(origens):
+            # Remove arestas repetidas mantendo o último peso, como faz o nx.Graph
+            menor = np.minimum(origens, destinos)
+            maior = np.maximum(origens, destinos)
+            chave = menor * max(n, 1) + maior
+            _, primeiros = np.unique(chave[::-1], return_index=True)
+            manter = np.sort(len(chave) - 1 - primeiros)
+            origens, destinos, pesos = origens[manter], destinos[manter], pesos[manter]
+
+        # Cada aresta comum entra nos dois sentidos; laços entram uma vez só
+        comum = origens != destinos
+        src = np.concatenate((origens, destinos[comum]))
+        dst = np.concatenate((destinos, origens[comum]))
+        pes = np.concatenate((pesos, pesos[comum]))
+
+        # Ordena as entradas pelo vértice de origem mantendo a ordem de inserção
+        ordem = np.argsort(src, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        return cls(list(rotulos), offsets, dst[ordem], pes[ordem], len(origens))
+
+    # Converte um nx.Graph em GrafoCompacto, preservando a ordem dos vértices
+    @classmethod
+    def de_networkx(cls, grafo):
+        rotulos = list(grafo.nodes())
+        indice = {r: i for i, r in enumerate(rotulos)}
+        origens, destinos, pesos = [], [], []
+        for origem, destino, peso in grafo.edges(data='weight', default=1):
+            origens.append(indice[origem])
+            destinos.append(indice[destino])
+            pesos.append(peso)
+        return cls.de_arestas(rotulos, origens, destinos, pesos)
+
+    # Converte de volta para nx.Graph (usado pelo pyvis e pelas rotinas do networkx)
+    def para_networkx(self):
+        grafo = nx.Graph()
+        grafo.add_nodes_from(self.rotulos)
+        grafo.add_weighted_edges_from(self.arestas())
+        return grafo
+
+    # Percorre as arestas como (rótulo de origem, rótulo de destino, peso), cada uma uma única vez
+    def arestas(self):
+        rotulos = list(self.rotulos)
+        offsets, vizinhos = self.adjacencia()
+        pesos = memoryview(self.pesos)
+        for u in range(len(offsets) - 1):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = vizinhos[i]
+                if v >= u:
+                    yield rotulos[u], rotulos[v], pesos[i]
+
+    # Dicionário rótulo -> id, montado somente quando necessário
+    @property
+    def indice(self):
+        if self._indice is None:
+            self._indice = {r: i for i, r in enumerate(self.rotulos)}
+        return self._indice
+
+    @property
+    def nodes(self):
+        return self.rotulos
+
+    def __len__(self):
+        return len(self.rotulos)
+
+    def number_of_nodes(self):
+        return len(self.rotulos)
+
+    def number_of_edges(self):
+        return self.num_arestas
+
+    # Vetor de graus; um laço conta 2, seguindo a convenção do networkx
+    def graus(self):
+        if self._graus is None:
+            n = len(self.rotulos)
+            graus = np.diff(self.offsets)
+            origem = np.repeat(np.arange(n, dtype=np.int64), graus)
+            lacos = np.bincount(origem[self.vizinhos == origem], minlength=n)
+            self._graus = graus + lacos
+        return self._graus
+
+    # Número de laços, calculado uma vez a partir do vetor de graus
+    def lacos(self):
+        if self._lacos is None:
+            self._lacos = int((self.graus() - np.diff(self.offsets)).sum())
+        return self._lacos
+
+    # Grau de cada vértice sem contar laços (quantidade de vizinhos distintos dele)
+    def graus_sem_lacos(self):
+        return 2 * np.diff(self.offsets) - self.graus()
+
+    # Visões sem cópia dos vetores CSR; indexá-las devolve ints do Python
+    def adjacencia(self):
+        return memoryview(self.offsets), memoryview(self.vizinhos)
+
+    def vizinhos_de(self, v):
+        return self.vizinhos[self.offsets[v]:self.offsets[v + 1]]
+
+    def tem_aresta(self, u, v):
+        # Procura na lista de adjacência do extremo de menor grau
+        if self.offsets[u + 1] - self.offsets[u] > self.offsets[v + 1] - self.offsets[v]:
+            u, v = v, u
+        return bool(np.any(self.vizinhos_de(u) == v))
+
+# Devolve o grafo na forma compacta, convertendo um nx.Graph se necessário
+def para_compacto(grafo):
+    if isinstance(grafo, GrafoCompacto):
+        return grafo
+    if isinstance(grafo, GrafoIncremental):
+        return grafo.compacto()
+    return GrafoCompacto.de_networkx(grafo)
+
+# Percorre as arestas (origem, destino, peso) de um nx.Graph ou de um GrafoCompacto
+def arestas_com_peso(grafo):
+    if isinstance(grafo, GrafoCompacto):
+        return grafo.arestas()
+    if isinstance(grafo, GrafoIncremental):
+        grafo = grafo.grafo
+    return grafo.edges(data='weight', default=1)
+
+# Devolve o grafo como nx.Graph, convertendo um GrafoCompacto se necessário
+def para_networkx(grafo):
+    if isinstance(grafo, GrafoCompacto):
+        return grafo.para_networkx()
+    if isinstance(grafo, GrafoIncremental):
+        return grafo.grafo
+    return grafo
+
+# Grafo editável (nx.Graph) que mantém as respostas das propriedades baratas a cada edição:
+# graus mínimo/máximo (histograma de graus), quantidade de vértices de grau ímpar, componentes
+# e bipartição (union-find com paridade), existência de ciclo (E > V - C) e, daí, árvore,
+# floresta, conexo, euleriano (circuito ou caminho), completo e regular (contagem de laços e de
+# arestas). Inserções custam O(α(V)); as consultas são O(1).
+# Remover aresta não é suportado pelo union-find: ele é marcado como inválido e reconstruído
+# (O(V+E)) na próxima consulta que depender dele. Propriedades que não são mantidas aqui
+# (número cromático, planaridade, hamiltoniano...) usam compacto(), que é recalculado
+# somente quando o grafo mudou.
+class GrafoIncremental:
+    def __init__(self, grafo=None):
+        self.grafo = nx.Graph()
+        # Contador de mutações: muda a cada aresta ou vértice inserido/removido
+        self.versao = 0
+        self._grau = {}
+        self._por_grau = {}
+        self._grau_min = 0
+        self._grau_max = 0
+        self._impares = 0
+        self._lacos = 0
+        self._compacto = None
+        self._versao_compacto = -1
+        self._reiniciar_union_find()
+        if grafo is not None:
+            for v in grafo.nodes:
+                self.add_node(v)
+            for origem, destino, peso in arestas_com_peso(grafo):
+                self.add_edge(origem, destino, weight=peso)
+
+    def _reiniciar_union_find(self):
+        self._pai = {v: v for v in self.grafo.nodes()}
+        # Paridade do vértice em relação ao pai (0 = mesmo lado da bipartição, 1 = lado oposto)
+        self._paridade = {v: 0 for v in self.grafo.nodes()}
+        self._tamanho = {v: 1 for v in self.grafo.nodes()}
+        self._componentes = self.grafo.number_of_nodes()
+        self._bipartido = True
+        self._union_find_valido = True
+
+    # Raiz do conjunto de v e a paridade de v em relação a ela (com compressão de caminho)
+    def _encontrar(self, v):
+        caminho = []
+        while self._pai[v] != v:
+            caminho.append(v)
+            v = self._pai[v]
+        raiz = v
+        # Percorre do mais próximo da raiz para o mais distante acumulando a paridade
+        paridade = 0
+        for u in reversed(caminho):
+            paridade ^= self._paridade[u]
+            self._paridade[u] = paridade
+            self._pai[u] = raiz
+        return raiz, (self._paridade[caminho[0]] if caminho else 0)
+
+    def _unir(self, u, v):
+        raiz_u, par_u = self._encontrar(u)
+        raiz_v, par_v = self._encontrar(v)
+        if raiz_u == raiz_v:
+            # Aresta dentro de um mesmo conjunto: fecha um ciclo ímpar se as paridades coincidem
+            if par_u == par_v:
+                self._bipartido = False
+            return
+        if self._tamanho[raiz_u] < self._tamanho[raiz_v]:
+            raiz_u, raiz_v = raiz_v, raiz_u
+        self._pai[raiz_v] = raiz_u
+        # u e v ficam em lados opostos: paridade(v) = paridade(u) ^ 1
+        self._paridade[raiz_v] = par_u ^ par_v ^ 1
+        self._tamanho[raiz_u] += self._tamanho[raiz_v]
+        self._componentes -= 1
+
+    def _garantir_union_find(self):
+        if not self._union_find_valido:
+            self._reiniciar_union_find()
+            for u, v in self.grafo.edges():
+                self._unir(u, v)
+
+    # Atualiza o grau de v (e o histograma, o mínimo, o máximo e os ímpares) em "delta"
+    def _mudar_grau(self, v, delta):
+        antigo = self._grau[v]
+        novo = antigo + delta
+        self._grau[v] = novo
+        self._por_grau[antigo] -= 1
+        self._por_grau[novo] = self._por_grau.get(novo, 0) + 1
+        if antigo % 2 != novo % 2:
+            self._impares += 1 if novo % 2 else -1
+        if novo > self._grau_max:
+            self._grau_max = novo
+        if novo < self._grau_min:
+            self._grau_min = novo
+        # Se o grau extremo esvaziou, o novo extremo está a no máximo |delta| passos dele
+        while self._por_grau.get(self._grau_max, 0) == 0 and self._grau_max > 0:
+            self._grau_max -= 1
+        while self._por_grau.get(self._grau_min, 0) == 0 and self._grau_min < self._grau_max:
+            self._grau_min += 1
+
+    def add_node(self, v):
+        if v in self._grau:
+            return
+        self.grafo.add_node(v)
+        self.versao += 1
+        self._grau[v] = 0
+        self._por_grau[0] = self._por_grau.get(0, 0) + 1
+        self._grau_min = 0
+        self._pai[v] = v
+        self._paridade[v] = 0
+        self._tamanho[v] = 1
+        self._componentes += 1
+
+    def add_edge(self, u, v, **atributos):
+        self.add_node(u)
+        self.add_node(v)
+        nova = not self.grafo.has_edge(u, v)
+        self.grafo.add_edge(u, v, **atributos)
+        self.versao += 1
+        if not nova:
+            return
+        if u == v:
+            # Um laço soma 2 ao grau e impede a bipartição
+            self._mudar_grau(u, 2)
+            self._lacos += 1
+            self._bipartido = False
+        else:
+            self._mudar_grau(u, 1)
+            self._mudar_grau(v, 1)
+            if self._union_find_valido:
+                self._unir(u, v)
+
+    def remove_edge(self, u, v):
+        self.grafo.remove_edge(u, v)
+        self.versao += 1
+        if u == v:
+            self._mudar_grau(u, -2)
+            self._lacos -= 1
+        else:
+            self._mudar_grau(u, -1)
+            self._mudar_grau(v, -1)
+        # O union-find não desfaz uniões: será reconstruído na próxima consulta
+        self._union_find_valido = False
 
-#função para verificar se o grafo é planar
-def is_planar_advanced(grafo):
-    if grafo.number_of_nodes() <= 20:
-        # Função para verificar se um grafo contém K5 ou K3,3
-        # Implementação ingênua para grafos pequenos
-
-        # Verificar se contém K5 (grafo completo com 5 vértices)
-        k5_vertices = set()
-        for v in grafo.nodes():
-            if grafo.degree(v) >= 5:
-                k5_vertices.add(v)
-                if len(k5_vertices) == 5:
-                    return True  # Encontrou K5
-
-        # Reinicializar para verificar K3,3 (grafo bipartido completo com 6 vértices)
-        k5_vertices.clear()
-
-        # Verificar se contém K3,3
-        for v in grafo.nodes():
-            if grafo.degree(v) >= 3:
-                k5_vertices.add(v)
-                if len(k5_vertices) == 3:
-                    # Verificar bipartição
-                    neighbors = set(grafo.neighbors(v))
-                    if all(grafo.degree(u) >= 3 for u in neighbors):
-                        return True  # Encontrou K3,3
-
-        return False  # Não encontrou nenhum dos dois
-    else:
-        # Verifica a planaridade do grafo utilizando a biblioteca networkx
-        # A função retorna uma tupla (boolean, subgrafo), onde o boolean indica se o grafo é planar
-        # e o subgrafo é um planoembedding do grafo (usado para desenhar o grafo planar).
-        # Aqui, pegamos apenas o boolean, indicando se o grafo é planar ou não.
-        if not check_planarity(grafo)[0]:
-            return False
+    # Interface mínima de nx.Graph usada pelo restante do programa
+    @property
+    def nodes(self):
+        return self.grafo.nodes
 
-    return True
+    def number_of_nodes(self):
+        return self.grafo.number_of_nodes()
 
-#função para verificar se um grafo é uma árvore
-def is_tree(grafo):
-    # Verifica se o grafo é conexo usando a função is_connected do módulo networkx
-    if not nx.is_connected(grafo):
-        return False  # O grafo não é conexo, portanto, não é uma árvore
-
-    # Inicializa um conjunto para rastrear nós visitados e uma fila para o algoritmo BFS
-    visited = set()
-    queue = [next(grafo.nodes)]  # Inicie o BFS a partir de um vértice qualquer
-
-    while queue:
-         # Pop o próximo nó da fila
-        node = queue.pop(0)
-        visited.add(node)
-
-        # Itera sobre os vizinhos do nó atual
-        for neighbor in grafo.neighbors(node):
-            if neighbor not in visited:
-                # Se o vizinho não foi visitado, adiciona à fila
-                queue.append(neighbor)
-            else:
-                # Se o vizinho já foi visitado, encontrou um ciclo, portanto, não é uma árvore
-                return False  # Encontrou um ciclo, portanto, não é uma árvore
+    def number_of_edges(self):
+        return self.grafo.number_of_edges()
 
-    return len(visited) == len(grafo.nodes)  # Verifique se todos os nós foram visitados
+    # GrafoCompacto do estado atual, reconvertido só quando houve mudança desde a última chamada
+    def compacto(self):
+        if self._versao_compacto != self.versao:
+            self._compacto = GrafoCompacto.de_networkx(self.grafo)
+            self._versao_compacto = self.versao
+        return self._compacto
 
-#função para verificar o número cromático de um grafo
-def calcular_numero_cromatico(grafo):
-    if not grafo:
-        return 0  # Grafo vazio tem número cromático zero
+    # Consultas O(1) (ou reconstrução do union-find depois de uma remoção)
+    def grau_minimo(self):
+        return self._grau_min
 
-    vertices = list(grafo.nodes())
-    coloracao = {}  # Mapeia vértices para suas cores atribuídas
+    def grau_maximo(self):
+        return self._grau_max
 
-    for vertice in vertices:
-        vizinhos = set(coloracao.get(v, None) for v in grafo[vertice])
-        cor = 0
-        while cor in vizinhos:
-            cor += 1
-        coloracao[vertice] = cor
+    def vertices_grau_impar(self):
+        return self._impares
 
-    numero_cromatico = max(coloracao.values()) + 1
-    return numero_cromatico
+    def lacos(self):
+        return self._lacos
 
-#função para verificar se o grafo contém ciclos
-def verifica_ciclo(grafo):
-    # Conjunto para rastrear nós visitados durante a DFS
-    visitados = set()
-    # Conjunto para rastrear nós na pilha durante a DFS
-    pilha = set()
-
-    # Função de busca em profundidade recursiva
-    def dfs(v):
-        # Adiciona o nó ao conjunto de visitados e à pilha
-        visitados.add(v)
-        pilha.add(v)
-
-        # Itera sobre os vizinhos do nó atual
-        for vizinho in grafo.neighbors(v):
-            if vizinho not in visitados:
-                # Se o vizinho não foi visitado, realiza a DFS recursivamente
-                if dfs(vizinho):
-                    return True
-            elif vizinho in pilha:
-                # Se o vizinho já está na pilha, encontrou um ciclo
-                return True
-        # Remove o nó da pilha após explorar todos os vizinhos
-        pilha.remove(v)
-        # Indica que não foi encontrado ciclo a partir deste nó
-        return False
+    # Completo e regular saem do número de arestas, dos laços e do histograma de graus, em O(1)
+    def arestas_complemento(self):
+        n = self.number_of_nodes()
+        return n * (n - 1) // 2 - (self.number_of_edges() - self._lacos)
 
-    # Itera sobre todos os nós do grafo
-    for node in grafo.nodes:
-        # Se o nó não foi visitado, inicia a DFS a partir desse nó
-        if node not in visitados:
-            if dfs(node):
-                # Se encontrou ciclo a partir deste nó, retorna True
-                return True
-    # Se nenhum ciclo foi encontrado em toda a busca, retorna False
-    return False
+    def completo(self):
+        return self.arestas_complemento() == 0
 
-# Função para verificar se um grafo é conexo
-def verifica_conexo(grafo):
-    if not grafo:
-        return False  # Grafo vazio não é conexo
+    def regular(self, k=None):
+        if not self.number_of_nodes() or self._grau_min != self._grau_max:
+            return False
+        return k is None or self._grau_max == k
+
+    # Primeiro par não adjacente na ordem de inserção (a mesma do GrafoCompacto), em O(V)
+    def primeiro_par_faltante(self):
+        n = self.number_of_nodes()
+        adjacencia = self.grafo.adj
+        vertices = list(self.grafo.nodes)
+        for i, u in enumerate(vertices):
+            vizinhos = adjacencia[u]
+            if len(vizinhos) - (u in vizinhos) == n - 1:
+                continue
+            for v in vertices[i + 1:]:
+                if v not in vizinhos:
+                    return u, v
+        return None
+
+    def componentes(self):
+        self._garantir_union_find()
+        return self._componentes
+
+    def conexo(self):
+        return self.number_of_nodes() > 0 and self.componentes() == 1
+
+    def bipartido(self):
+        self._garantir_union_find()
+        return self.number_of_nodes() > 0 and self._bipartido
+
+    def ciclico(self):
+        # Grafo simples: acíclico exatamente quando E = V - C (laços contam como arestas)
+        return self.number_of_edges() > self.number_of_nodes() - self.componentes()
+
+    def arvore(self):
+        return self.conexo() and not self.ciclico()
+
+    # Mesma classificação de classificar_euleriano: as componentes que têm arestas são as
+    # componentes do union-find menos os vértices isolados (grau 0, contados no histograma)
+    def tipo_euleriano(self):
+        if not self.number_of_nodes() or self._impares not in (0, 2):
+            return None
+        if self.componentes() - self._por_grau.get(0, 0) > 1:
+            return None
+        return 'circuito' if self._impares == 0 else 'caminho'
+
+    def euleriano(self):
+        return self.tipo_euleriano() == 'circuito'
+
+
+# Instrumentação das etapas quentes (carga, análise, desenho). Desligada, cada função marcada
+# com @instrumentar custa só um teste de atributo; ligada pela variável GRAFO_INSTRUMENTAR ou
+# pela opção --instrumentar, com modos separados por vírgula:
+#   tempo   - tempo de parede e vértices/arestas visitados por etapa (padrão quando ligada)
+#   memoria - também o pico de alocação de cada etapa (tracemalloc)
+#   perfil  - também um cProfile de cada etapa de nível mais alto (as mais caras do perfil)
+#   tudo    - todos os modos
+# O tempo de uma etapa inclui as etapas chamadas dentro dela. O tracemalloc é global ao processo:
+# com várias tarefas rodando em threads, os picos de memória de cada etapa são aproximados.
+LIMITE_PERFIL = 10
+
+class Instrumentacao:
+    def __init__(self, modos=None):
+        modos = {modo.strip().lower() for modo in (modos or '').split(',')} - {'', '0', 'nao', 'não'}
+        if 'tudo' in modos:
+            modos |= {'memoria', 'perfil'}
+        self.modos = ','.join(sorted(modos))
+        self.ativa = bool(modos)
+        self.memoria = 'memoria' in modos
+        self.perfil = 'perfil' in modos
+        self.etapas = {}
+        # Cada thread (tarefas do servidor) tem a sua pilha de etapas; o total é protegido por lock
+        self._local = threading.local()
+        self._trava = threading.Lock()
+
+    @property
+    def _pilha(self):
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def iniciar(self, nome):
+        quadro = {'nome': nome, 'vertices': 0, 'arestas': 0, 'pico': 0, 'perfil': None}
+        if self.memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            atual, pico = tracemalloc.get_traced_memory()
+            # O pico é zerado para a etapa nova; o da etapa de fora é guardado no quadro dela
+            if self._pilha:
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+            tracemalloc.reset_peak()
+            quadro['memoria_inicial'] = atual
+        if self.perfil and not self._pilha:
+            quadro['perfil'] = cProfile.Profile()
+            quadro['perfil'].enable()
+        self._pilha.append(quadro)
+        quadro['inicio'] = time.perf_counter()
+        return quadro
+
+    def terminar(self, quadro):
+        segundos = time.perf_counter() - quadro['inicio']
+        self._pilha.pop()
+        if quadro['perfil'] is not None:
+            quadro['perfil'].disable()
+        with self._trava:
+            etapa = self.etapas.setdefault(quadro['nome'], {'chamadas': 0, 'segundos': 0.0,
+                                                            'vertices': 0, 'arestas': 0})
+            etapa['chamadas'] += 1
+            etapa['segundos'] += segundos
+            etapa['vertices'] += quadro['vertices']
+            etapa['arestas'] += quadro['arestas']
+            if self.memoria:
+                pico = max(tracemalloc.get_traced_memory()[1], quadro['pico'])
+                if self._pilha:
+                    self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+                alocado = (pico - quadro['memoria_inicial']) / 1024
+                etapa['pico_kb'] = max(etapa.get('pico_kb', 0), round(alocado, 1))
+            if quadro['perfil'] is not None:
+                etapa['perfil'] = _resumir_perfil(quadro['perfil'])
+
+    # Soma vértices/arestas visitados à etapa em andamento
+    def contar(self, vertices=0, arestas=0):
+        if self._pilha:
+            self._pilha[-1]['vertices'] += vertices
+            self._pilha[-1]['arestas'] += arestas
+
+    # Resumo por etapa, só com tipos simples (vai nas linhas JSON do modo em lote)
+    def resumo(self):
+        with self._trava:
+            return {nome: dict(etapa, segundos=round(etapa['segundos'], 6))
+                    for nome, etapa in self.etapas.items()}
+
+    def limpar(self):
+        self.etapas = {}
+
+# As funções mais caras (tempo acumulado) de um cProfile, como lista de dicionários
+def _resumir_perfil(perfil):
+    estatisticas = pstats.Stats(perfil).stats
+    mais_caras = sorted(estatisticas.items(), key=lambda item: -item[1][3])[:LIMITE_PERFIL]
+    return [{'funcao': f"{os.path.basename(arquivo)}:{linha}({funcao})", 'chamadas': chamadas,
+             'tempo_proprio': round(proprio, 6), 'tempo_acumulado': round(acumulado, 6)}
+            for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in mais_caras]
+
+instrumentacao = Instrumentacao(os.environ.get('GRAFO_INSTRUMENTAR'))
+
+# Liga, desliga ou troca os modos da instrumentação global
+def configurar_instrumentacao(modos=None):
+    global instrumentacao
+    instrumentacao = Instrumentacao(modos)
+
+# Decorador que mede a função como uma etapa. Os vértices e arestas visitados são só os que a
+# própria função informa (contar_visitas) no trecho que percorre o grafo: uma chamada respondida
+# por cache não informa nada e conta 0 visitas.
+def instrumentar(nome):
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not instrumentacao.ativa:
+                return funcao(*args, **kwargs)
+            quadro = instrumentacao.iniciar(nome)
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                instrumentacao.terminar(quadro)
+        return medida
+    return decorador
+
+# Mede um trecho de código como etapa: with medir_etapa('desenho.html'): ...
+@contextlib.contextmanager
+def _etapa_medida(nome):
+    quadro = instrumentacao.iniciar(nome)
+    try:
+        yield
+    finally:
+        instrumentacao.terminar(quadro)
+
+def medir_etapa(nome):
+    if not instrumentacao.ativa:
+        return contextlib.nullcontext()
+    return _etapa_medida(nome)
+
+def contar_visitas(vertices=0, arestas=0):
+    if instrumentacao.ativa:
+        instrumentacao.contar(vertices, arestas)
+
+# Junta os resumos de vários arquivos (modo em lote): soma chamadas, tempos e visitas e fica
+# com o maior pico; os perfis não são somados
+def agregar_instrumentacao(resumos):
+    total = {}
+    for resumo in resumos:
+        for nome, etapa in resumo.items():
+            soma = total.setdefault(nome, {'chamadas': 0, 'segundos': 0.0, 'vertices': 0, 'arestas': 0})
+            for chave in ('chamadas', 'segundos', 'vertices', 'arestas'):
+                soma[chave] += etapa[chave]
+            if 'pico_kb' in etapa:
+                soma['pico_kb'] = max(soma.get('pico_kb', 0), etapa['pico_kb'])
+    for soma in total.values():
+        soma['segundos'] = round(soma['segundos'], 6)
+    return total
+
+# Exibe um resumo de instrumentação em tabela, da etapa mais demorada para a mais rápida
+def exibir_instrumentacao(resumo, saida=None):
+    saida = saida or sys.stderr
+    print(f"{'etapa':32} {'chamadas':>8} {'segundos':>10} {'vértices':>12} {'arestas':>12} {'pico KB':>10}",
+          file=saida)
+    for nome, etapa in sorted(resumo.items(), key=lambda item: -item[1]['segundos']):
+        pico = f"{etapa['pico_kb']:.1f}" if 'pico_kb' in etapa else "-"
+        print(f"{nome:32} {etapa['chamadas']:>8} {etapa['segundos']:>10.4f} {etapa['vertices']:>12} "
+              f"{etapa['arestas']:>12} {pico:>10}", file=saida)
+
+# Tarefa do servidor de tarefas que está rodando nesta thread (None fora de uma tarefa).
+# As buscas longas informam o progresso e consultam o cancelamento por aqui, sem precisar
+# receber a tarefa como parâmetro; fora de uma tarefa as duas consultas custam um getattr.
+_contexto_tarefa = threading.local()
+
+def informar_progresso(**campos):
+    tarefa = getattr(_contexto_tarefa, 'tarefa', None)
+    if tarefa is not None:
+        tarefa.progresso.update(campos)
+
+def tarefa_cancelada():
+    tarefa = getattr(_contexto_tarefa, 'tarefa', None)
+    return tarefa is not None and tarefa.cancelar.is_set()
+
+# Rótulo como texto qualificado pelo tipo. Strings (o caso comum) ganham um prefixo que nenhum
+# nome de tipo tem; os demais viram "tipo:repr"
+def _rotulo_canonico(rotulo):
+    if type(rotulo) is str:
+        return '\x01' + rotulo
+    return f"{type(rotulo).__qualname__}:{rotulo!r}"
+
+# Impressão digital canônica do conteúdo do grafo: hash das arestas (com pesos) renumeradas pela
+# ordem alfabética dos rótulos e ordenadas, mais a tabela de rótulos. Não depende da ordem em que
+# as arestas foram lidas. Fica guardada no GrafoCompacto; um GrafoIncremental gera um novo
+# GrafoCompacto a cada mudança de versão, então a impressão é recalculada só depois de uma edição.
+# Os rótulos entram com o tipo: 1 e '1' são vértices diferentes, e os resultados em cache
+# (ciclos, colorações, articulações) devolvem os rótulos do grafo que os calculou.
+# A posição canônica de cada id (g._posto) fica guardada junto: o mesmo grafo lido em outra
+# ordem tem a mesma impressão e ids diferentes, e é por ela que os resultados indexados por id
+# voltam do cache (veja memorizar_propriedade).
+@instrumentar('impressao_digital')
+def impressao_digital(grafo):
+    g = para_compacto(grafo)
+    if g._impressao is None:
+        n = g.number_of_nodes()
+        rotulos = [_rotulo_canonico(rotulo) for rotulo in g.rotulos]
+        ordem = sorted(range(n), key=rotulos.__getitem__)
+        posto = np.empty(n, dtype=np.int64)
+        posto[ordem] = np.arange(n, dtype=np.int64)
+
+        # Cada aresta uma única vez (a partir do extremo de menor id), já com ids canônicos
+        origem = np.repeat(np.arange(n, dtype=np.int64), np.diff(g.offsets))
+        uma_vez = g.vizinhos >= origem
+        a = posto[origem[uma_vez]]
+        b = posto[g.vizinhos[uma_vez]]
+        menor, maior = np.minimum(a, b), np.maximum(a, b)
+        ordem_arestas = np.lexsort((maior, menor))
+        contar_visitas(n, len(menor))
+
+        resumo = hashlib.blake2b(digest_size=20)
+        resumo.update(struct.pack('<qq', n, len(menor)))
+        resumo.update('\0'.join(rotulos[v] for v in ordem).encode('utf-8'))
+        resumo.update(menor[ordem_arestas].tobytes())
+        resumo.update(maior[ordem_arestas].tobytes())
+        resumo.update(g.pesos[uma_vez][ordem_arestas].astype(np.float64).tobytes())
+        g._impressao = resumo.hexdigest()
+        g._posto = posto
+    return g._impressao
+
+# Posição de cada id na ordem canônica dos rótulos (calculada com a impressão digital)
+def posto_canonico(grafo):
+    g = para_compacto(grafo)
+    impressao_digital(g)
+    return g._posto
+
+# Cache de resultados de propriedades: LRU limitado em memória e, opcionalmente, um diretório
+# em disco (um arquivo pickle por resultado) que persiste entre execuções e entre processos.
+# O LRU é protegido por uma trava, porque as tarefas em segundo plano o usam de várias threads.
+# Os valores ficam serializados (pickle) também na memória: cada consulta devolve uma cópia nova,
+# e serializar um certificado grande (embedding, subgrafo) custa bem menos que um deepcopy.
+class CachePropriedades:
+    def __init__(self, capacidade=128, diretorio=None):
+        self.capacidade = capacidade
+        self.diretorio = diretorio
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def _arquivo(self, chave):
+        nome = hashlib.blake2b(repr(chave).encode('utf-8'), digest_size=20).hexdigest()
+        return os.path.join(self.diretorio, nome + '.pkl')
+
+    # Devolve (encontrado, valor); o valor é uma cópia, para que o chamador possa alterá-lo
+    def obter(self, chave):
+        with self._trava:
+            dados = self._memoria.get(chave)
+            if dados is not None:
+                self._memoria.move_to_end(chave)
+                self.acertos += 1
+        if dados is None and self.diretorio:
+            try:
+                with open(self._arquivo(chave), 'rb') as file:
+                    dados = file.read()
+                valor = pickle.loads(dados)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                dados = None
+            else:
+                self._guardar_na_memoria(chave, dados)
+                with self._trava:
+                    self.acertos += 1
+                return True, valor
+        if dados is not None:
+            return True, pickle.loads(dados)
+        with self._trava:
+            self.falhas += 1
+        return False, None
+
+    def guardar(self, chave, valor):
+        # Sem memória nem disco não há onde guardar: nem serializa
+        if self.capacidade <= 0 and not self.diretorio:
+            return
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        self._guardar_na_memoria(chave, dados)
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+            destino = self._arquivo(chave)
+            # Escreve em um arquivo temporário e renomeia, para outro processo nunca ler pela metade
+            temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as file:
+                file.write(dados)
+            os.replace(temporario, destino)
+
+    def _guardar_na_memoria(self, chave, valor):
+        with self._trava:
+            self._memoria[chave] = valor
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.capacidade:
+                self._memoria.popitem(last=False)
+
+    def limpar(self):
+        with self._trava:
+            self._memoria.clear()
+
+# Cache global usado pelas verificações caras; o diretório em disco pode vir da variável GRAFO_CACHE_DIR
+cache_propriedades = CachePropriedades(diretorio=os.environ.get('GRAFO_CACHE_DIR'))
+
+# Reconfigura o cache global (tamanho do LRU e diretório em disco)
+def configurar_cache(capacidade=128, diretorio=None):
+    global cache_propriedades
+    cache_propriedades = CachePropriedades(capacidade, diretorio)
+
+# Um resultado só vai para o cache se for definitivo: buscas interrompidas pelo prazo
+# (número cromático não provado, hamiltoniano indefinido) podem melhorar com mais tempo
+def _resultado_definitivo(resultado):
+    if isinstance(resultado, dict):
+        if (resultado.get('provado') is False or 'tempo_esgotado' in resultado
+                or ('hamiltoniano' in resultado and resultado['hamiltoniano'] is None)):
+            return False
+        return all(_resultado_definitivo(valor) for valor in resultado.values())
+    return True
+
+# Decorador que memoriza o resultado de uma propriedade pela impressão digital do grafo.
+# Prazos e eventos de cancelamento não entram na chave: um resultado definitivo não depende deles.
+# A impressão não depende da ordem dos vértices, mas os ids dependem: as chaves do resultado
+# listadas em "por_vertice" (listas indexadas por id, como a coloração) vão para o cache na ordem
+# canônica dos rótulos e voltam reindexadas pelos ids do grafo que fez a consulta.
+def memorizar_propriedade(funcao=None, por_vertice=()):
+    if funcao is None:
+        return lambda funcao: memorizar_propriedade(funcao, por_vertice)
+    parametros = list(inspect.signature(funcao).parameters)[1:]
+
+    @functools.wraps(funcao)
+    def memorizada(grafo, *args, **kwargs):
+        valores = dict(zip(parametros, args))
+        valores.update(kwargs)
+        g = para_compacto(grafo)
+        chave = (funcao.__name__, impressao_digital(g),
+                 tuple(sorted((nome, repr(valor)) for nome, valor in valores.items()
+                              if nome not in ('tempo_limite', 'cancelar'))))
+        encontrado, resultado = cache_propriedades.obter(chave)
+        if encontrado:
+            posto = posto_canonico(g)
+            for nome in por_vertice:
+                resultado[nome] = [resultado[nome][p] for p in posto.tolist()]
+            return resultado
+        resultado = funcao(grafo, *args, **kwargs)
+        if _resultado_definitivo(resultado):
+            canonico = dict(resultado)
+            if por_vertice:
+                ordem = np.argsort(posto_canonico(g)).tolist()
+                for nome in por_vertice:
+                    canonico[nome] = [resultado[nome][v] for v in ordem]
+            cache_propriedades.guardar(chave, canonico)
+        return resultado
+    return memorizada
+
+# Tamanho padrão dos blocos lidos do arquivo pelo carregador de arestas (16 MiB)
+TAMANHO_BLOCO = 1 << 24
+
+# Bytes tratados como espaço em branco nos arquivos TXT (espaço, \t, \n, \v, \f, \r)
+_ESPACOS = np.zeros(256, dtype=bool)
+_ESPACOS[[32, 9, 10, 11, 12, 13]] = True
+
+# Separa a lista plana de campos (colunas por linha fixas) em origens, destinos e pesos
+def _campos_para_arestas(campos, colunas):
+    origens = campos[0::colunas]
+    destinos = campos[1::colunas]
+    if colunas > 2:
+        pesos = np.array(campos[2::colunas], dtype=bytes).astype(np.int64)
+    else:
+        # Assume peso 1 se a terceira coluna não existir
+        pesos = np.ones(len(origens), dtype=np.int64)
+    return origens, destinos, pesos
+
+# Caminho lento: interpreta o bloco linha a linha (aspas no CSV ou número de colunas variável)
+def _analisar_linhas(bloco, csv_formato):
+    texto = bloco.decode('utf-8')
+    if csv_formato:
+        linhas = csv.reader(texto.splitlines())
+    else:
+        linhas = (linha.split() for linha in texto.splitlines())
+    origens, destinos, pesos = [], [], []
+    for row in linhas:
+        if len(row) >= 2:
+            origens.append(row[0].encode('utf-8'))
+            destinos.append(row[1].encode('utf-8'))
+            pesos.append(int(row[2]) if len(row) > 2 else 1)
+    return origens, destinos, np.array(pesos, dtype=np.int64)
+
+# Interpreta um bloco de linhas completas de uma vez só.
+# Quando todas as linhas têm o mesmo número de campos, os campos são separados com um único
+# split sobre o bloco inteiro e as colunas saem por fatiamento (sem laço Python por linha).
+def _analisar_bloco(bloco, csv_formato):
+    if b'\r' in bloco:
+        bloco = bloco.replace(b'\r', b'')
+    dados = np.frombuffer(bloco, dtype=np.uint8)
+    quebras = np.flatnonzero(dados == 10)
+
+    if csv_formato:
+        if b'"' in bloco:
+            return _analisar_linhas(bloco, csv_formato)
+        # Campos por linha = vírgulas na linha + 1
+        virgulas = np.flatnonzero(dados == 44)
+        fronteiras = np.concatenate(([0], quebras, [len(dados)]))
+        por_linha = np.diff(np.searchsorted(virgulas, fronteiras)) + 1
+        colunas = int(por_linha[0])
+        if colunas < 2 or np.any(por_linha != colunas):
+            return _analisar_linhas(bloco, csv_formato)
+        campos = bloco.replace(b'\n', b',').split(b',')
+    else:
+        # Início de campo = byte não branco precedido por branco (ou início do bloco)
+        branco = _ESPACOS[dados]
+        inicios = np.flatnonzero(~branco & np.concatenate(([True], branco[:-1])))
+        fronteiras = np.concatenate(([0], quebras + 1, [len(dados) + 1]))
+        por_linha = np.diff(np.searchsorted(inicios, fronteiras))
+        # Linhas em branco são ignoradas, como no formato original
+        por_linha = por_linha[por_linha > 0]
+        if not len(por_linha):
+            return _analisar_linhas(b'', csv_formato)
+        colunas = int(por_linha[0])
+        if colunas < 2 or np.any(por_linha != colunas):
+            return _analisar_linhas(bloco, csv_formato)
+        campos = bloco.split()
+
+    return _campos_para_arestas(campos, colunas)
+
+# Lê um arquivo de arestas (CSV ou TXT) em blocos de tamanho fixo.
+# Produz, para cada bloco, (origens, destinos, pesos): listas de rótulos em bytes e um vetor de pesos.
+def ler_blocos_de_arestas(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    csv_formato = arquivo.endswith('.csv')
+    with open(arquivo, 'rb') as file:
+        resto = b''
+        while True:
+            bloco = file.read(tamanho_bloco)
+            if not bloco:
+                break
+            bloco = resto + bloco
+            # Só as linhas completas são interpretadas; a linha cortada fica para o próximo bloco
+            fim = bloco.rfind(b'\n')
+            if fim == -1:
+                resto = bloco
+                continue
+            resto = bloco[fim + 1:]
+            yield _analisar_bloco(bloco[:fim], csv_formato)
+        if resto.strip():
+            yield _analisar_bloco(resto, csv_formato)
+
+# Converte rótulos (bytes) em ids inteiros, cadastrando os rótulos novos na ordem em que aparecem.
+# O len(indice) é avaliado antes da inserção, então cada rótulo novo recebe o próximo id livre.
+def internar_rotulos(tokens, indice):
+    return np.array([indice.setdefault(t, len(indice)) for t in tokens], dtype=np.int64)
+
+# Pico de memória residente do processo, em MB (None se o sistema não informar)
+def pico_memoria_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # No Linux o ru_maxrss é dado em KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Carrega um arquivo de arestas inteiro em um GrafoCompacto, com inserção em lote.
+# Devolve o grafo e um dicionário com as estatísticas da carga.
+@instrumentar('carga')
+def carregar_arestas(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    inicio = time.perf_counter()
+    indice = {}
+    blocos_origem, blocos_destino, blocos_peso = [], [], []
+
+    with medir_etapa('carga.leitura'):
+        for origens, destinos, pesos in ler_blocos_de_arestas(arquivo, tamanho_bloco):
+            # Intercala origem e destino para que os vértices sejam numerados na ordem do arquivo
+            pares = [None] * (2 * len(origens))
+            pares[0::2] = origens
+            pares[1::2] = destinos
+            ids = internar_rotulos(pares, indice)
+            blocos_origem.append(ids[0::2])
+            blocos_destino.append(ids[1::2])
+            blocos_peso.append(pesos)
+
+    if blocos_origem:
+        origens = np.concatenate(blocos_origem)
+        destinos = np.concatenate(blocos_destino)
+        pesos = np.concatenate(blocos_peso)
+    else:
+        origens = destinos = pesos = np.zeros(0, dtype=np.int64)
+    rotulos = [rotulo.decode('utf-8') for rotulo in indice]
+    with medir_etapa('carga.csr'):
+        grafo = GrafoCompacto.de_arestas(rotulos, origens, destinos, pesos)
+    contar_visitas(grafo.number_of_nodes(), len(origens))
+
+    segundos = time.perf_counter() - inicio
+    estatisticas = {
+        'arestas_lidas': len(origens),
+        'vertices': grafo.number_of_nodes(),
+        'arestas': grafo.number_of_edges(),
+        'segundos': segundos,
+        'arestas_por_segundo': len(origens) / segundos if segundos > 0 else float('inf'),
+        'pico_memoria_mb': pico_memoria_mb(),
+    }
+    return grafo, estatisticas
+
+# Exibe as estatísticas de uma carga feita por carregar_arestas
+def exibir_estatisticas_carga(estatisticas):
+    print(f"{estatisticas['arestas_lidas']} arestas lidas em {estatisticas['segundos']:.3f} s "
+          f"({estatisticas['arestas_por_segundo']:.0f} arestas/s)")
+    if estatisticas['pico_memoria_mb'] is not None:
+        print(f"Pico de memória: {estatisticas['pico_memoria_mb']:.1f} MB")
+
+# Análise fora da memória: quantos bytes de RAM por byte de arquivo a carga completa costuma
+# usar (estimativa usada pelo menu para sugerir a análise em fluxo)
+FATOR_MEMORIA_CARGA = 10
+# Blocos menores na análise em fluxo: o pico de memória passa a ser dominado pelos vértices
+TAMANHO_BLOCO_FLUXO = 1 << 22
+
+# Memória física disponível em bytes (None se o sistema não informar)
+def memoria_disponivel():
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+# Indica se carregar o arquivo inteiro provavelmente não cabe na memória disponível
+def carga_excede_memoria(arquivo):
+    disponivel = memoria_disponivel()
+    return disponivel is not None and os.path.getsize(arquivo) * FATOR_MEMORIA_CARGA > disponivel
+
+# Une, em lote, as extremidades a[i] e b[i] de um union-find vetorizado. O vetor pai chega e sai
+# totalmente comprimido (cada elemento aponta direto para a raiz); cada rodada pendura a raiz
+# maior de cada aresta na menor e comprime de novo, até as extremidades terem a mesma raiz.
+def _unir_em_lote(pai, a, b):
+    while len(a):
+        raiz_a = pai[a]
+        raiz_b = pai[b]
+        diferentes = raiz_a != raiz_b
+        if not diferentes.any():
+            return
+        a, b = a[diferentes], b[diferentes]
+        raiz_a, raiz_b = raiz_a[diferentes], raiz_b[diferentes]
+        np.minimum.at(pai, np.maximum(raiz_a, raiz_b), np.minimum(raiz_a, raiz_b))
+        while True:
+            avos = pai[pai]
+            if np.array_equal(avos, pai):
+                break
+            pai[:] = avos
+
+# Analisa um arquivo de arestas em fluxo, bloco a bloco, sem montar o grafo: a memória depende
+# só do número de vértices (rótulos, graus e um union-find), não do número de arestas.
+# Responde o que um union-find consegue decidir: componentes, ciclos, graus e paridade euleriana,
+# e bipartição pela cobertura dupla (cada vértice v vira v0 e v1, e a aresta u-v liga u0-v1 e
+# u1-v0; o grafo é bipartido se nenhum v0 cai na mesma componente que o seu v1).
+# Cada linha do arquivo conta como uma aresta: repetições não podem ser detectadas sem guardar
+# as arestas, então o arquivo deve listar cada aresta uma vez (como os salvos pelo menu).
+@instrumentar('fluxo')
+def analisar_em_fluxo(arquivo, tamanho_bloco=TAMANHO_BLOCO_FLUXO):
+    inicio = time.perf_counter()
+    indice = {}
+    graus = np.zeros(0, dtype=np.int64)
+    pai = np.zeros(0, dtype=np.int64)
+    arestas = lacos = 0
+    for origens, destinos, _ in ler_blocos_de_arestas(arquivo, tamanho_bloco):
+        pares = [None] * (2 * len(origens))
+        pares[0::2] = origens
+        pares[1::2] = destinos
+        ids = internar_rotulos(pares, indice)
+        u, v = ids[0::2], ids[1::2]
+        # Os vetores por vértice crescem dobrando, como uma lista
+        if len(indice) > len(graus):
+            capacidade = max(len(indice), 2 * len(graus))
+            graus = np.concatenate((graus, np.zeros(capacidade - len(graus), dtype=np.int64)))
+            pai = np.concatenate((pai, np.arange(len(pai), 2 * capacidade, dtype=np.int64)))
+        # Um laço soma 2 ao grau do vértice, como em GrafoCompacto.graus
+        graus += np.bincount(u, minlength=len(graus)) + np.bincount(v, minlength=len(graus))
+        lacos += int(np.count_nonzero(u == v))
+        arestas += len(u)
+        _unir_em_lote(pai, np.concatenate((2 * u, 2 * u + 1)), np.concatenate((2 * v + 1, 2 * v)))
+        informar_progresso(arestas_lidas=arestas, vertices=len(indice))
+
+    n = len(indice)
+    contar_visitas(n, arestas)
+    resultado = {'vertices': n, 'arestas': arestas, 'lacos': lacos}
+    if n:
+        graus = graus[:n]
+        raizes = pai[:2 * n]
+        # As duas cópias de um vértice ficam nas duas metades (ou juntas) da mesma componente
+        componente = np.minimum(raizes[0::2], raizes[1::2])
+        _, tamanhos = np.unique(componente, return_counts=True)
+        componentes = len(tamanhos)
+        impares = int(np.count_nonzero(graus % 2))
+        ciclico = arestas > n - componentes
+        resultado.update({
+            'grau_minimo': int(graus.min()),
+            'grau_maximo': int(graus.max()),
+            'vertices_grau_impar': impares,
+            'componentes': componentes,
+            'maior_componente': int(tamanhos.max()),
+            'conexo': componentes == 1,
+            'ciclico': ciclico,
+            'floresta': not ciclico,
+            'arvore': not ciclico and componentes == 1,
+            'bipartido': bool(np.all(raizes[0::2] != raizes[1::2])),
+            # Todo vértice de um arquivo de arestas tem aresta, então basta o grafo ser conexo
+            'euleriano': componentes == 1 and impares == 0,
+            'caminho_euleriano': componentes == 1 and impares == 2,
+        })
+    resultado['segundos'] = round(time.perf_counter() - inicio, 6)
+    resultado['pico_memoria_mb'] = pico_memoria_mb()
+    return resultado
+
+# Exibe o resultado de analisar_em_fluxo em forma de relatório
+def exibir_analise_em_fluxo(resultado):
+    def sim_nao(valor):
+        return "sim" if valor else "não"
+
+    print(f"Vértices: {resultado['vertices']}  Arestas: {resultado['arestas']}  Laços: {resultado['lacos']}")
+    if resultado['vertices']:
+        print(f"Grau mínimo: {resultado['grau_minimo']}  Grau máximo: {resultado['grau_maximo']}")
+        print(f"Conexo: {sim_nao(resultado['conexo'])} ({resultado['componentes']} componente(s), "
+              f"maior com {resultado['maior_componente']} vértices)")
+        print(f"Cíclico: {sim_nao(resultado['ciclico'])}  Floresta: {sim_nao(resultado['floresta'])}  "
+              f"Árvore: {sim_nao(resultado['arvore'])}")
+        print(f"Bipartido: {sim_nao(resultado['bipartido'])}")
+        print(f"Euleriano: {sim_nao(resultado['euleriano'])}  "
+              f"Caminho euleriano: {sim_nao(resultado['caminho_euleriano'])} "
+              f"({resultado['vertices_grau_impar']} vértice(s) de grau ímpar)")
+    linha = f"Analisado em fluxo em {resultado['segundos']:.3f} s"
+    if resultado['pico_memoria_mb'] is not None:
+        linha += f" (pico de memória: {resultado['pico_memoria_mb']:.1f} MB)"
+    print(linha)
+
+# Formato binário de snapshot (.grafo), versão 1, little-endian:
+#   cabeçalho de 64 bytes: assinatura, versão, tipo dos pesos, n, m, entradas CSR, bytes dos rótulos
+#   offsets (int64[n + 1]), vizinhos (int64[entradas]), pesos (int64 ou float64[entradas]),
+#   offsets dos rótulos (int64[n + 1]) e os rótulos em UTF-8 concatenados.
+# Cada seção começa em um múltiplo de 8 bytes, então todas podem ser mapeadas direto com numpy.memmap.
+ASSINATURA_SNAPSHOT = b'GRAFOCSR'
+VERSAO_SNAPSHOT = 1
+_CABECALHO_SNAPSHOT = struct.Struct('<8sIIqqqq')
+_TAMANHO_CABECALHO = 64
+_TIPOS_PESO = {0: np.dtype('<i8'), 1: np.dtype('<f8')}
+
+# Sequência de rótulos lida de um snapshot; cada rótulo só é decodificado quando acessado
+class RotulosMapeados:
+    def __init__(self, offsets, dados):
+        self.offsets = offsets
+        self.dados = dados
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return bytes(self.dados[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        offsets = self.offsets.tolist()
+        dados = memoryview(self.dados)
+        for i in range(len(offsets) - 1):
+            yield str(dados[offsets[i]:offsets[i + 1]], 'utf-8')
+
+# Posição do próximo múltiplo de 8 bytes
+def _alinhar(posicao):
+    return (posicao + 7) & ~7
+
+# Grava o grafo no formato binário de snapshot
+@instrumentar('snapshot.salvar')
+def salvar_snapshot(grafo, arquivo):
+    g = para_compacto(grafo)
+    contar_visitas(g.number_of_nodes(), g.number_of_edges())
+    pesos = g.pesos
+    tipo_peso = 0 if pesos.dtype.kind in 'iu' else 1
+    pesos = pesos.astype(_TIPOS_PESO[tipo_peso], copy=False)
+
+    # Tabela de rótulos: texto UTF-8 concatenado e a posição de início de cada rótulo
+    codificados = [str(rotulo).encode('utf-8') for rotulo in g.rotulos]
+    offsets_rotulos = np.zeros(len(codificados) + 1, dtype='<i8')
+    np.cumsum([len(r) for r in codificados], out=offsets_rotulos[1:])
+    dados_rotulos = b''.join(codificados)
+
+    secoes = [g.offsets.astype('<i8', copy=False), g.vizinhos.astype('<i8', copy=False),
+              pesos, offsets_rotulos]
+    with open(arquivo, 'wb') as file:
+        cabecalho = _CABECALHO_SNAPSHOT.pack(ASSINATURA_SNAPSHOT, VERSAO_SNAPSHOT, tipo_peso,
+                                             g.number_of_nodes(), g.number_of_edges(),
+                                             len(g.vizinhos), len(dados_rotulos))
+        file.write(cabecalho.ljust(_TAMANHO_CABECALHO, b'\0'))
+        for secao in secoes:
+            file.write(secao.tobytes())
+            # Completa a seção até o próximo múltiplo de 8 bytes
+            file.write(b'\0' * (_alinhar(file.tell()) - file.tell()))
+        file.write(dados_rotulos)
+
+# Reabre um snapshot mapeando os vetores do arquivo na memória, sem copiá-los
+@instrumentar('snapshot.abrir')
+def abrir_snapshot(arquivo):
+    with open(arquivo, 'rb') as file:
+        cabecalho = file.read(_TAMANHO_CABECALHO)
+    if len(cabecalho) < _TAMANHO_CABECALHO:
+        raise ValueError("Arquivo de snapshot truncado.")
+    assinatura, versao, tipo_peso, n, m, entradas, tamanho_rotulos = \
+        _CABECALHO_SNAPSHOT.unpack_from(cabecalho)
+    if assinatura != ASSINATURA_SNAPSHOT:
+        raise ValueError("O arquivo não é um snapshot de grafo.")
+    if versao != VERSAO_SNAPSHOT:
+        raise ValueError(f"Versão de snapshot não suportada: {versao}")
+
+    posicao = _TAMANHO_CABECALHO
+
+    # Mapeia a próxima seção do arquivo como um vetor somente leitura
+    def mapear(tipo, tamanho):
+        nonlocal posicao
+        if tamanho == 0:
+            vetor = np.zeros(0, dtype=tipo)
+        else:
+            vetor = np.memmap(arquivo, dtype=tipo, mode='r', offset=posicao, shape=(tamanho,))
+        posicao = _alinhar(posicao + tamanho * np.dtype(tipo).itemsize)
+        return vetor
+
+    offsets = mapear('<i8', n + 1)
+    vizinhos = mapear('<i8', entradas)
+    pesos = mapear(_TIPOS_PESO[tipo_peso], entradas)
+    offsets_rotulos = mapear('<i8', n + 1)
+    dados_rotulos = mapear(np.uint8, tamanho_rotulos)
+    rotulos = RotulosMapeados(offsets_rotulos, dados_rotulos)
+    return GrafoCompacto(rotulos, offsets, vizinhos, pesos, m)
+
+# Resultado da rotulação de componentes conexas de um GrafoCompacto.
+# Guarda, para cada vértice, a componente, a cor da bipartição (0/1) e o pai na árvore BFS;
+# para cada componente, o tamanho, se é bipartida e a aresta que quebrou a bipartição.
+class ComponentesConexas:
+    def __init__(self, componente, cor, pai, tamanhos, conflitos):
+        self.componente = componente
+        self.cor = cor
+        self.pai = pai
+        self.tamanhos = tamanhos
+        self.conflitos = conflitos
+
+    @property
+    def quantidade(self):
+        return len(self.tamanhos)
+
+    # Uma componente é bipartida se a BFS não encontrou aresta entre vértices da mesma cor
+    def bipartida(self, c):
+        return self.conflitos[c] is None
+
+    def todas_bipartidas(self):
+        return all(conflito is None for conflito in self.conflitos)
+
+    # Vértices de cada lado da bipartição da componente c
+    def biparticao(self, c):
+        vertices = np.flatnonzero(self.componente == c)
+        lado = self.cor[vertices]
+        return vertices[lado == 0].tolist(), vertices[lado == 1].tolist()
+
+    # Ciclo ímpar que prova que a componente c não é bipartida (lista de ids), ou None.
+    # Liga os dois extremos da aresta em conflito pelo ancestral comum na árvore BFS.
+    def ciclo_impar(self, c):
+        conflito = self.conflitos[c]
+        if conflito is None:
+            return None
+        v, w = conflito
+        caminho_v = [v]
+        while self.pai[caminho_v[-1]] != -1:
+            caminho_v.append(self.pai[caminho_v[-1]])
+        posicao = {x: i for i, x in enumerate(caminho_v)}
+        caminho_w = [w]
+        while caminho_w[-1] not in posicao:
+            caminho_w.append(self.pai[caminho_w[-1]])
+        ancestral = caminho_w.pop()
+        return caminho_v[:posicao[ancestral] + 1] + caminho_w[::-1]
+
+# Rotula todas as componentes conexas em uma única BFS O(V+E), calculando junto a 2-coloração.
+# O resultado fica guardado no próprio GrafoCompacto e é reaproveitado pelas outras verificações.
+@instrumentar('componentes')
+def rotular_componentes(grafo):
+    g = para_compacto(grafo)
+    if g._componentes is not None:
+        return g._componentes
+
+    n = g.number_of_nodes()
+    contar_visitas(n, g.number_of_edges())
+    offsets, vizinhos = g.adjacencia()
+    componente = [-1] * n
+    cor = bytearray(n)
+    pai = [-1] * n
+    tamanhos, conflitos = [], []
+
+    for raiz in range(n):
+        if componente[raiz] != -1:
+            continue
+        c = len(tamanhos)
+        componente[raiz] = c
+        tamanho = 1
+        conflito = None
+        fila = deque([raiz])
+        while fila:
+            v = fila.popleft()
+            cor_v = cor[v]
+            for w in vizinhos[offsets[v]:offsets[v + 1]]:
+                if componente[w] == -1:
+                    componente[w] = c
+                    cor[w] = cor_v ^ 1
+                    pai[w] = v
+                    fila.append(w)
+                    tamanho += 1
+                elif conflito is None and cor[w] == cor_v:
+                    # Dois vértices adjacentes com a mesma cor (ou um laço): a componente não é bipartida
+                    conflito = (v, w)
+        tamanhos.append(tamanho)
+        conflitos.append(conflito)
+
+    g._componentes = ComponentesConexas(np.array(componente, dtype=np.int64),
+                                        np.frombuffer(cor, dtype=np.uint8), pai, tamanhos, conflitos)
+    return g._componentes
+
+# Classifica o grafo quanto a ciclos sem percorrê-lo de novo.
+# Como o GrafoCompacto é simples (sem arestas repetidas), ele é uma floresta exatamente quando
+# E = V - C, onde C é o número de componentes da rotulação compartilhada; laços contam como ciclo.
+# Devolve um dicionário com as chaves 'ciclico', 'floresta', 'arvore' e 'componentes'.
+def classificar_aciclicidade(grafo):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+
+    # Um grafo simples com pelo menos n arestas sempre tem ciclo; não é preciso percorrê-lo
+    if g.number_of_edges() >= n and n > 0 and g._componentes is None:
+        return {'ciclico': True, 'floresta': False, 'arvore': False, 'componentes': None}
+
+    componentes = rotular_componentes(g).quantidade
+    ciclico = g.number_of_edges() > n - componentes
+    return {
+        'ciclico': ciclico,
+        'floresta': not ciclico,
+        'arvore': not ciclico and componentes == 1,
+        'componentes': componentes,
+    }
+
+# Tempo máximo (em segundos) do número cromático: preparação dos limites e busca exata
+TEMPO_LIMITE_CROMATICO = 10.0
+# Partes com até tantos vértices montam a adjacência local em Python; as maiores usam numpy
+LIMITE_ADJACENCIA_PYTHON = 64
+# Até quantas arestas a coloração decompõe o grafo em blocos só para si; acima disso o Tarjan
+# custa mais do que a busca exata consegue aproveitar no prazo (um índice já calculado é sempre usado)
+LIMITE_ARESTAS_BLOCOS = 200000
+
+# Ordem de degeneração (smallest-last) pelo algoritmo de Batagelj-Zaversnik, em O(V+E).
+# Devolve a ordem de remoção dos vértices e o número de núcleo (core number) de cada um.
+def ordem_degeneracao(grafo):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    offsets, vizinhos = g.adjacencia()
+    # Grau sem laços: cada laço aparece uma vez na lista de adjacência e conta 2 em graus()
+    grau = g.graus_sem_lacos().tolist()
+    maior = max(grau, default=0)
+
+    # Ordena os vértices por grau com counting sort (bin[d] = início do bloco de grau d)
+    bin_ = [0] * (maior + 1)
+    for d in grau:
+        bin_[d] += 1
+    inicio = 0
+    for d in range(maior + 1):
+        bin_[d], inicio = inicio, inicio + bin_[d]
+    pos = [0] * n
+    vert = [0] * n
+    for v in range(n):
+        pos[v] = bin_[grau[v]]
+        vert[pos[v]] = v
+        bin_[grau[v]] += 1
+    for d in range(maior, 0, -1):
+        bin_[d] = bin_[d - 1]
+    bin_[0] = 0
+
+    # Remove sempre o vértice de menor grau restante, atualizando os vizinhos no lugar
+    for i in range(n):
+        v = vert[i]
+        grau_v = grau[v]
+        for u in vizinhos[offsets[v]:offsets[v + 1]]:
+            grau_u = grau[u]
+            if grau_u > grau_v:
+                pos_u = pos[u]
+                pos_w = bin_[grau_u]
+                w = vert[pos_w]
+                if u != w:
+                    vert[pos_u], vert[pos_w] = w, u
+                    pos[u], pos[w] = pos_w, pos_u
+                bin_[grau_u] += 1
+                grau[u] = grau_u - 1
+    return vert, grau
+
+# Listas de adjacência de uma parte do grafo em numeração local, sem laços e sem vizinhos de fora.
+# "local" é um vetor de V posições com -1, emprestado pelo chamador e devolvido com -1 de novo.
+def _adjacencia_local(g, parte, local):
+    local[parte] = np.arange(len(parte))
+    if len(parte) <= LIMITE_ADJACENCIA_PYTHON:
+        offsets, vizinhos = g.adjacencia()
+        adjacencia = [[int(local[w]) for w in vizinhos[offsets[v]:offsets[v + 1]]
+                       if w != v and local[w] >= 0] for v in parte]
+    else:
+        # Todas as listas de uma vez: junta as fatias do CSR, traduz os ids e corta por vértice
+        parte = np.asarray(parte, dtype=np.int64)
+        inicio = g.offsets[parte]
+        tamanho = g.offsets[parte + 1] - inicio
+        fim = np.cumsum(tamanho)
+        posicoes = np.arange(fim[-1]) + np.repeat(inicio - (fim - tamanho), tamanho)
+        linha = np.repeat(np.arange(len(parte)), tamanho)
+        destino = local[g.vizinhos[posicoes]]
+        manter = (destino >= 0) & (destino != linha)
+        cortes = np.cumsum(np.bincount(linha[manter], minlength=len(parte))).tolist()
+        plano = destino[manter].tolist()
+        adjacencia = [plano[a:b] for a, b in zip([0] + cortes[:-1], cortes)]
+    local[parte] = -1
+    return adjacencia
+
+# Coloração gulosa seguindo a ordem dada; devolve a cor de cada vértice local
+def _colorir_guloso(adjacencia, ordem):
+    cor = [-1] * len(adjacencia)
+    for v in ordem:
+        usadas = {cor[w] for w in adjacencia[v]}
+        c = 0
+        while c in usadas:
+            c += 1
+        cor[v] = c
+    return cor
+
+# 2-coloração por BFS de uma componente ou bloco em numeração local (usada quando a rotulação
+# global só acusou um laço, que a coloração ignora). Devolve as cores, ou None se não for bipartido.
+def _bipartido_local(adjacencia):
+    cor = [-1] * len(adjacencia)
+    for raiz in range(len(adjacencia)):
+        if cor[raiz] >= 0:
+            continue
+        cor[raiz] = 0
+        fila = deque([raiz])
+        while fila:
+            v = fila.popleft()
+            for w in adjacencia[v]:
+                if cor[w] < 0:
+                    cor[w] = cor[v] ^ 1
+                    fila.append(w)
+                elif cor[w] == cor[v]:
+                    return None
+    return cor
+
+# Clique grande encontrada gulosamente a partir de cada vértice, do fim para o início da ordem
+# de degeneração (núcleos mais densos primeiro). Um vértice de núcleo k só está em cliques de até
+# k + 1 vértices, então vértices e vizinhos que não aumentariam a melhor clique são descartados.
+# Cada vizinhança vira conjunto uma única vez, na primeira vez em que é usada; cada passo só encolhe
+# o conjunto de vizinhos comuns.
+# No prazo, devolve a maior clique encontrada até ali (continua sendo um limite inferior).
+def _clique_gulosa(adjacencia, ordem, nucleo, prazo):
+    vizinhanca = [None] * len(adjacencia)
+    melhor = [ordem[0]] if ordem else []
+    for v in reversed(ordem):
+        tamanho = len(melhor)
+        if nucleo[v] + 1 <= tamanho:
+            continue
+        if _interromper(prazo, None):
+            break
+        candidatos = sorted((u for u in adjacencia[v] if nucleo[u] >= tamanho),
+                            key=lambda u: -nucleo[u])
+        clique = [v]
+        comuns = set(candidatos)
+        for u in candidatos:
+            if u in comuns:
+                clique.append(u)
+                if vizinhanca[u] is None:
+                    vizinhanca[u] = set(adjacencia[u])
+                comuns &= vizinhanca[u]
+        if len(clique) > len(melhor):
+            melhor = clique
+    return melhor
+
+# Branch-and-bound DSATUR iterativo (pilha explícita) sobre uma componente.
+# Parte da melhor coloração conhecida e para ao atingir o limite inferior ou o prazo.
+# Devolve (número de cores, coloração, provado).
+def _dsatur_exato(adjacencia, clique, coloracao, limite_inferior, prazo):
+    n = len(adjacencia)
+    melhor = max(coloracao) + 1
+    melhor_cor = list(coloracao)
+    if melhor <= limite_inferior:
+        return melhor, melhor_cor, True
+
+    grau = [len(vizinhos) for vizinhos in adjacencia]
+    cor = [-1] * n
+    # contagem[v][c] = vizinhos de v com a cor c (criada quando o primeiro vizinho de v é colorido,
+    # para não alocar V listas antes do primeiro passo); saturacao[v] = cores distintas entre os vizinhos
+    contagem = [None] * n
+    saturacao = [0] * n
+    fila = []
+
+    def atribuir(v, c):
+        cor[v] = c
+        for w in adjacencia[v]:
+            vizinhos_w = contagem[w]
+            if vizinhos_w is None:
+                vizinhos_w = contagem[w] = [0] * melhor
+            if vizinhos_w[c] == 0:
+                saturacao[w] += 1
+                if cor[w] < 0:
+                    heapq.heappush(fila, (-saturacao[w], -grau[w], w))
+            vizinhos_w[c] += 1
+
+    def remover(v):
+        c = cor[v]
+        cor[v] = -1
+        for w in adjacencia[v]:
+            vizinhos_w = contagem[w]
+            vizinhos_w[c] -= 1
+            if vizinhos_w[c] == 0:
+                saturacao[w] -= 1
+                if cor[w] < 0:
+                    heapq.heappush(fila, (-saturacao[w], -grau[w], w))
+        heapq.heappush(fila, (-saturacao[v], -grau[v], v))
+
+    # Próximo vértice: maior saturação, desempate pelo maior grau (e pelo menor id).
+    # Heap preguiçoso: cada mudança de saturação de um vértice sem cor empilha a chave nova e as
+    # entradas velhas (vértice já colorido ou saturação diferente) são descartadas ao chegar ao
+    # topo. Quando o lixo passa de 4V entradas, o heap é refeito só com os vértices sem cor.
+    def escolher():
+        if len(fila) > 4 * n:
+            fila[:] = [(-saturacao[v], -grau[v], v) for v in range(n) if cor[v] < 0]
+            heapq.heapify(fila)
+        while fila:
+            menos_saturacao, _, v = fila[0]
+            if cor[v] < 0 and -menos_saturacao == saturacao[v]:
+                return v
+            heapq.heappop(fila)
+        return -1
+
+    # Os vértices da clique recebem cores distintas fixas (quebra de simetria)
+    for c, v in enumerate(clique):
+        atribuir(v, c)
+    fila = [(-saturacao[v], -grau[v], v) for v in range(n) if cor[v] < 0]
+    heapq.heapify(fila)
+    coloridos = len(clique)
+    pilha = [[escolher(), 0, len(clique)]]
+    passos = 0
+    try:
+        while pilha:
+            passos += 1
+            # Um passo custa O(grau + log V); o relógio é conferido a cada 64 passos
+            if passos & 63 == 0 and _interromper(prazo, None):
+                return melhor, melhor_cor, False
+            if passos & 1023 == 0:
+                informar_progresso(nos_expandidos=passos, melhor_limite=melhor)
+            quadro = pilha[-1]
+            v, c, usadas = quadro
+            if cor[v] >= 0:
+                remover(v)
+                coloridos -= 1
+            # Só vale tentar cores já usadas ou a próxima nova, e sem chegar ao melhor já encontrado
+            limite = min(usadas, melhor - 2)
+            vizinhos_v = contagem[v]
+            if vizinhos_v is not None:
+                while c <= limite and vizinhos_v[c]:
+                    c += 1
+            if c > limite:
+                pilha.pop()
+                continue
+            quadro[1] = c + 1
+            atribuir(v, c)
+            coloridos += 1
+            usadas_agora = max(usadas, c + 1)
+            if coloridos == n:
+                melhor = usadas_agora
+                melhor_cor = list(cor)
+                informar_progresso(nos_expandidos=passos, melhor_limite=melhor)
+                if melhor <= limite_inferior:
+                    return melhor, melhor_cor, True
+                continue
+            pilha.append([escolher(), 0, usadas_agora])
+
+        # A árvore de busca foi esgotada: a melhor coloração encontrada é ótima
+        return melhor, melhor_cor, True
+    finally:
+        # Nós da árvore de busca visitados (para a instrumentação)
+        contar_visitas(vertices=passos)
+
+# Calcula o número cromático decompondo o grafo por componentes conexas.
+# Cada componente recebe um limite inferior (clique, ciclo ímpar) e um superior (guloso na ordem
+# de degeneração); a busca exata só roda onde os limites diferem e pode mudar o máximo global.
+# Devolve um dicionário com 'limite_inferior', 'limite_superior', 'provado' e 'coloracao'.
+@instrumentar('cromatico')
+@memorizar_propriedade(por_vertice=('coloracao',))
+def calcular_coloracao_exata(grafo, tempo_limite=TEMPO_LIMITE_CROMATICO):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    if not n:
+        return {'limite_inferior': 0, 'limite_superior': 0, 'provado': True, 'coloracao': []}
+
+    prazo = time.perf_counter() + tempo_limite
+    # Ordem de degeneração e colorações gulosas percorrem o grafo; os passos do DSATUR somam depois
+    contar_visitas(n, g.number_of_edges())
+    componentes = rotular_componentes(g)
+    # O prazo é conferido entre as etapas da preparação. Vencido, só continua o que é preciso para
+    # uma coloração válida: sem a ordem de degeneração, os vértices são coloridos do maior para o
+    # menor grau (o grau limita o núcleo), e a clique e a busca exata ficam de fora.
+    if _interromper(prazo, None):
+        graus = g.graus_sem_lacos()
+        ordem = np.argsort(graus, kind='stable').tolist()
+        nucleo = graus.tolist()
+    else:
+        ordem, nucleo = ordem_degeneracao(g)
+    coloracao = np.zeros(n, dtype=np.int64)
+
+    # Agrupa a ordem de degeneração por componente (mantendo a ordem dentro de cada uma)
+    por_componente = [[] for _ in range(componentes.quantidade)]
+    componente = componentes.componente.tolist()
+    for v in ordem:
+        por_componente[componente[v]].append(v)
+
+    # O número cromático de uma componente é o maior entre os dos seus blocos, então as componentes
+    # não bipartidas com pontos de articulação são coloridas bloco a bloco. Os blocos vêm na ordem
+    # inversa à do Tarjan: assim cada bloco encontra no máximo um vértice já colorido (o ponto de
+    # articulação que o liga aos anteriores) e as cores dos blocos se juntam por uma troca de cores.
+    blocos_por_componente = [[] for _ in range(componentes.quantidade)]
+    decompor = g._estrutura is not None or (g.number_of_edges() <= LIMITE_ARESTAS_BLOCOS
+                                            and not _interromper(prazo, None))
+    if decompor and not componentes.todas_bipartidas():
+        estrutura = indice_estrutural(g)
+        posicao = np.empty(n, dtype=np.int64)
+        posicao[ordem] = np.arange(n)
+        for vertices_bloco in reversed(estrutura.vertices_dos_blocos):
+            blocos_por_componente[componente[vertices_bloco[0]]].append(vertices_bloco)
+
+    local = np.full(n, -1, dtype=np.int64)
+    unidades = []
+    pendentes = []
+    limite_inferior = 1
+    limite_superior = 1
+    for c, vertices in enumerate(por_componente):
+        if componentes.bipartida(c):
+            # Componente bipartida: 1 cor se não tem arestas, 2 caso contrário
+            cores = 2 if len(vertices) > 1 else 1
+            coloracao[vertices] = componentes.cor[vertices] if cores == 2 else 0
+            limite_inferior = max(limite_inferior, cores)
+            limite_superior = max(limite_superior, cores)
+            continue
+
+        blocos = blocos_por_componente[c]
+        if len(blocos) > 1:
+            # Cada bloco na ordem de degeneração global, que continua limitando a coloração gulosa
+            partes = [sorted(bloco, key=posicao.__getitem__) for bloco in blocos]
+        else:
+            partes = [vertices]
+        for parte in partes:
+            # Numeração local da parte; laços são ignorados na coloração
+            adjacencia = _adjacencia_local(g, parte, local)
+            # Parte bipartida (bloco sem ciclo ímpar, ou componente cujo único conflito é um laço)
+            cor = _bipartido_local(adjacencia)
+            if cor is not None:
+                inferior = superior = 2 if len(parte) > 1 else 1
+                unidades.append((parte, cor))
+                limite_inferior = max(limite_inferior, inferior)
+                limite_superior = max(limite_superior, superior)
+                continue
+            ordem_local = list(range(len(parte)))
+            nucleo_local = [nucleo[v] for v in parte]
+            # Colorir do fim para o início da ordem de degeneração usa no máximo degeneração + 1 cores
+            cor = _colorir_guloso(adjacencia, reversed(ordem_local))
+            clique = _clique_gulosa(adjacencia, ordem_local, nucleo_local, prazo)
+            # Um ciclo ímpar exige pelo menos 3 cores
+            inferior = max(len(clique), 3)
+            superior = max(cor) + 1
+            unidades.append((parte, cor))
+            limite_inferior = max(limite_inferior, inferior)
+            limite_superior = max(limite_superior, superior)
+            if superior > inferior:
+                pendentes.append((len(unidades) - 1, adjacencia, clique, cor, inferior))
+
+    # Busca exata começando pelas partes com o pior limite superior
+    informar_progresso(limite_inferior=limite_inferior, limite_superior=limite_superior)
+    provado = True
+    for unidade, adjacencia, clique, cor, inferior in sorted(pendentes, key=lambda p: -max(p[3])):
+        if max(cor) + 1 <= limite_inferior:
+            continue
+        if _interromper(prazo, None):
+            provado = False
+            continue
+        alvo = max(inferior, limite_inferior)
+        cores, cor, exato = _dsatur_exato(adjacencia, clique, cor, alvo, prazo)
+        unidades[unidade] = (unidades[unidade][0], cor)
+        if exato:
+            limite_inferior = max(limite_inferior, cores)
+        else:
+            provado = False
+            limite_inferior = max(limite_inferior, inferior)
+
+    # Junta as colorações das partes: se a parte já tem um vértice colorido, troca as duas cores
+    colorido = np.zeros(n, dtype=bool)
+    for parte, cor in unidades:
+        troca = {}
+        for v, c in zip(parte, cor):
+            if colorido[v]:
+                anterior = int(coloracao[v])
+                troca = {c: anterior, anterior: c}
+                break
+        coloracao[parte] = [troca.get(c, c) for c in cor]
+        colorido[parte] = True
+
+    limite_superior = int(coloracao.max()) + 1
+    if provado:
+        limite_inferior = limite_superior
+    return {
+        'limite_inferior': limite_inferior,
+        'limite_superior': limite_superior,
+        'provado': provado,
+        'coloracao': coloracao.tolist(),
+    }
 
-    visitados = set()
-    queue = [next(iter(grafo))]  # Inicie o BFS a partir de um vértice qualquer
+#função para verificar o número cromático de um grafo
+# Devolve o número cromático exato quando a busca termina dentro do prazo; caso contrário,
+# o melhor limite superior encontrado (use calcular_coloracao_exata para ver os dois limites)
+def calcular_numero_cromatico(grafo, tempo_limite=TEMPO_LIMITE_CROMATICO):
+    return calcular_coloracao_exata(grafo, tempo_limite)['limite_superior']
+
+# Índice estrutural de um GrafoCompacto: blocos (componentes biconexas), pontos de articulação
+# e pontes, calculados juntos por um único Tarjan iterativo e guardados no próprio grafo.
+# Os blocos são listas de arestas (u, v) em ids, na ordem em que o Tarjan os fecha; uma ponte é
+# um bloco de uma aresta só. Laços e vértices isolados não pertencem a nenhum bloco.
+class IndiceEstrutural:
+    def __init__(self, n, blocos, articulacoes):
+        self.n = n
+        self.blocos = blocos
+        self.articulacoes = articulacoes
+        self.pontes = [bloco[0] for bloco in blocos if len(bloco) == 1]
+        self._vertices_dos_blocos = None
+
+    # Há algum vértice ou aresta cuja remoção desconecta a componente?
+    @property
+    def tem_corte(self):
+        return bool(self.articulacoes) or bool(self.pontes)
+
+    # Vértices de cada bloco, em ordem crescente de id
+    @property
+    def vertices_dos_blocos(self):
+        if self._vertices_dos_blocos is None:
+            self._vertices_dos_blocos = [sorted({u for aresta in bloco for u in aresta})
+                                         for bloco in self.blocos]
+        return self._vertices_dos_blocos
+
+    # Arestas da árvore de blocos e cortes: (índice do bloco, ponto de articulação contido nele)
+    def arvore_blocos_cortes(self):
+        corte = np.zeros(self.n, dtype=bool)
+        corte[self.articulacoes] = True
+        return [(b, v) for b, vertices in enumerate(self.vertices_dos_blocos)
+                for v in vertices if corte[v]]
+
+# Tarjan iterativo com pilha de arestas, O(V+E): fecha um bloco sempre que a subárvore de v não
+# alcança acima do pai u. Nesse caso u é ponto de articulação, exceto quando é a raiz da DFS,
+# que só é ponto de articulação se tiver mais de um filho.
+@instrumentar('estrutura')
+def indice_estrutural(grafo):
+    g = para_compacto(grafo)
+    if g._estrutura is not None:
+        return g._estrutura
+
+    n = g.number_of_nodes()
+    offsets, vizinhos = g.adjacencia()
+    descoberta = [-1] * n
+    menor = [0] * n
+    articulacao = bytearray(n)
+    tempo = 0
+    blocos = []
+    arestas = []
+
+    for raiz in range(n):
+        if descoberta[raiz] != -1:
+            continue
+        descoberta[raiz] = menor[raiz] = tempo
+        tempo += 1
+        filhos_raiz = 0
+        # Quadro: [vértice, pai, posição do próximo vizinho no vetor CSR]
+        pilha = [[raiz, -1, offsets[raiz]]]
+        while pilha:
+            quadro = pilha[-1]
+            v, pai, i = quadro
+            if i < offsets[v + 1]:
+                quadro[2] = i + 1
+                w = vizinhos[i]
+                if w == v or w == pai:
+                    continue
+                if descoberta[w] == -1:
+                    arestas.append((v, w))
+                    descoberta[w] = menor[w] = tempo
+                    tempo += 1
+                    if v == raiz:
+                        filhos_raiz += 1
+                    pilha.append([w, v, offsets[w]])
+                elif descoberta[w] < descoberta[v]:
+                    # Aresta de retorno para um ancestral
+                    arestas.append((v, w))
+                    if descoberta[w] < menor[v]:
+                        menor[v] = descoberta[w]
+                continue
+            pilha.pop()
+            if pilha:
+                u = pilha[-1][0]
+                if menor[v] < menor[u]:
+                    menor[u] = menor[v]
+                if menor[v] >= descoberta[u]:
+                    # u separa a subárvore de v: as arestas empilhadas desde (u, v) formam um bloco
+                    if u != raiz:
+                        articulacao[u] = 1
+                    bloco = []
+                    while True:
+                        aresta = arestas.pop()
+                        bloco.append(aresta)
+                        if aresta == (u, v):
+                            break
+                    blocos.append(bloco)
+        if filhos_raiz > 1:
+            articulacao[raiz] = 1
+
+    articulacoes = np.flatnonzero(np.frombuffer(articulacao, dtype=np.uint8)).tolist()
+    contar_visitas(n, g.number_of_edges())
+    g._estrutura = IndiceEstrutural(n, blocos, articulacoes)
+    return g._estrutura
+
+# Componentes biconexas (blocos), vindas do índice estrutural compartilhado.
+# Devolve uma lista de blocos, cada um como lista de arestas (u, v) em ids; laços são ignorados.
+def componentes_biconexas(grafo):
+    return indice_estrutural(grafo).blocos
+
+# Resumo do índice estrutural com os rótulos originais, só com tipos simples (pronto para JSON)
+def analisar_estrutura(grafo):
+    g = para_compacto(grafo)
+    estrutura = indice_estrutural(g)
+    rotulos = g.rotulos
+    tamanhos = [len(vertices) for vertices in estrutura.vertices_dos_blocos]
+    return {
+        'pontes': [[rotulos[u], rotulos[v]] for u, v in estrutura.pontes],
+        'articulacoes': [rotulos[v] for v in estrutura.articulacoes],
+        'blocos': len(estrutura.blocos),
+        'maior_bloco': max(tamanhos, default=0),
+        'arvore_blocos_cortes': [[b, rotulos[v]] for b, v in estrutura.arvore_blocos_cortes()],
+    }
+
+# Teste de planaridade com pré-filtros baratos antes do teste linear (check_planarity do networkx):
+#  - todo grafo com até 4 vértices é planar;
+#  - grafo simples planar tem E <= 3V - 6, e E <= 2V - 4 se for bipartido;
+#  - com número ciclomático E - V + C <= 3 o grafo é planar: toda subdivisão de K3,3 tem 4 e
+#    toda subdivisão de K5 tem 6 (uma floresta tem 0). C vem da rotulação compartilhada;
+#  - o grafo é planar se e somente se todos os seus blocos (componentes biconexas) forem,
+#    então os filtros e o teste linear rodam por bloco (um bloco com E = V é só um ciclo).
+# Com certificado=True devolve a testemunha: o embedding planar (nx.PlanarEmbedding) ou um
+# subgrafo de Kuratowski (subdivisão de K5 ou K3,3, como nx.Graph com os rótulos originais).
+# O embedding é montado bloco a bloco (_embedding_por_blocos); com embedding=False só a
+# testemunha de não planaridade é procurada (o menu não exibe o embedding).
+@instrumentar('planaridade')
+@memorizar_propriedade
+def verificar_planaridade(grafo, certificado=False, embedding=True):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    m = g.number_of_edges() - g.lacos()
+
+    def resposta(planar, motivo, bloco=None, embeddings=None, densidade=None):
+        resultado = {'planar': planar, 'motivo': motivo, 'embedding': None, 'kuratowski': None}
+        if certificado:
+            if planar:
+                if embedding:
+                    resultado['embedding'] = _embedding_por_blocos(g, embeddings or {})
+            else:
+                # O subgrafo de Kuratowski é procurado só no bloco que falhou (ou no grafo todo) e,
+                # se a falha foi de densidade, só no menor subgrafo denso dele
+                if bloco is None:
+                    origem = np.repeat(np.arange(n, dtype=np.int64), np.diff(g.offsets))
+                    uma_vez = g.vizinhos > origem
+                    bloco = list(zip(origem[uma_vez].tolist(), g.vizinhos[uma_vez].tolist()))
+                if densidade is not None:
+                    bloco = _prefixo_denso(bloco, *densidade)
+                sub = nx.Graph()
+                sub.add_edges_from((g.rotulos[u], g.rotulos[v]) for u, v in bloco)
+                resultado['kuratowski'] = check_planarity(sub, counterexample=True)[1]
+        return resultado
+
+    if n <= 4:
+        return resposta(True, "até 4 vértices")
+    if m > 3 * n - 6:
+        return resposta(False, "E > 3V - 6", densidade=(3, 6))
+    componentes = rotular_componentes(g)
+    if m - n + componentes.quantidade <= 3:
+        motivo = "o grafo é uma floresta" if m == n - componentes.quantidade else "número ciclomático <= 3"
+        return resposta(True, motivo)
+
+    # Primeiro os filtros baratos em todos os blocos; só os que sobrarem vão para o teste linear
+    estrutura = indice_estrutural(g)
+    restantes = []
+    for indice, (bloco, vertices) in enumerate(zip(estrutura.blocos, estrutura.vertices_dos_blocos)):
+        m_bloco = len(bloco)
+        n_bloco = len(vertices)
+        if n_bloco <= 4 or m_bloco == n_bloco:
+            continue
+        if m_bloco > 3 * n_bloco - 6:
+            return resposta(False, "um bloco tem E > 3V - 6", bloco, densidade=(3, 6))
+        bipartido = componentes.bipartida(componentes.componente[bloco[0][0]])
+        if bipartido and m_bloco > 2 * n_bloco - 4:
+            return resposta(False, "um bloco bipartido tem E > 2V - 4", bloco, densidade=(2, 4))
+        restantes.append((indice, bloco))
+
+    # Blocos menores primeiro: uma violação pequena aparece antes de testar um bloco enorme.
+    # Os embeddings dos blocos só são guardados quando vão compor o certificado.
+    embeddings = {}
+    for indice, bloco in sorted(restantes, key=lambda restante: len(restante[1])):
+        sub = nx.Graph()
+        sub.add_edges_from(bloco)
+        contar_visitas(sub.number_of_nodes(), len(bloco))
+        planar, embedding_bloco = check_planarity(sub)
+        if not planar:
+            return resposta(False, "um bloco não passou no teste linear de planaridade", bloco)
+        if certificado and embedding:
+            embeddings[indice] = embedding_bloco
+    return resposta(True, "todos os blocos são planares", embeddings=embeddings)
+
+# Subgrafo pequeno que já passa do limite de arestas de um grafo planar (E > aV - b): os vértices
+# entram do maior para o menor grau e o corte é o primeiro prefixo cujo subgrafo induzido passa do
+# limite. A busca do subgrafo de Kuratowski (que testa a planaridade retirando aresta por aresta)
+# roda nele em vez de no grafo ou no bloco inteiro. Subgrafo de bipartido continua bipartido.
+def _prefixo_denso(arestas, a, b):
+    vizinhos = {}
+    for u, v in arestas:
+        vizinhos.setdefault(u, []).append(v)
+        vizinhos.setdefault(v, []).append(u)
+    dentro = set()
+    total = 0
+    for v in sorted(vizinhos, key=lambda v: -len(vizinhos[v])):
+        total += sum(1 for w in vizinhos[v] if w in dentro)
+        dentro.add(v)
+        if len(dentro) >= 3 and total > a * len(dentro) - b:
+            return [(u, w) for u, w in arestas if u in dentro and w in dentro]
+    return arestas
+
+# Embedding planar do grafo todo montado bloco a bloco. A rotação (vizinhos em sentido horário)
+# de cada vértice é a concatenação das suas rotações nos blocos que o contêm: um bloco preso a
+# outro por um ponto de articulação cabe numa face dele. Pontes e ciclos têm rotação trivial e
+# uma floresta é a própria lista de adjacência; os demais blocos usam o embedding do teste linear
+# ("embeddings": índice do bloco -> embedding em ids) ou chamam check_planarity só para si.
+def _embedding_por_blocos(g, embeddings):
+    n = g.number_of_nodes()
+    if g.number_of_edges() - g.lacos() == n - rotular_componentes(g).quantidade:
+        offsets, vizinhos = g.offsets.tolist(), g.vizinhos.tolist()
+        rotacao = [[w for w in vizinhos[offsets[v]:offsets[v + 1]] if w != v] for v in range(n)]
+    else:
+        rotacao = [[] for _ in range(n)]
+        estrutura = indice_estrutural(g)
+        for indice, (bloco, vertices) in enumerate(zip(estrutura.blocos, estrutura.vertices_dos_blocos)):
+            if len(bloco) == 1 or len(bloco) == len(vertices):
+                for u, v in bloco:
+                    rotacao[u].append(v)
+                    rotacao[v].append(u)
+                continue
+            embedding_bloco = embeddings.get(indice)
+            if embedding_bloco is None:
+                sub = nx.Graph()
+                sub.add_edges_from(bloco)
+                embedding_bloco = check_planarity(sub)[1]
+            for v, vizinhos_cw in embedding_bloco.get_data().items():
+                rotacao[v].extend(vizinhos_cw)
+    rotulos = g.rotulos
+    resultado = nx.PlanarEmbedding()
+    resultado.add_nodes_from(rotulos)
+    resultado.set_data({rotulos[v]: [rotulos[w] for w in rotacao[v]] for v in range(n)})
+    return resultado
 
-    while queue:
-        node = queue.pop(0)
-        visitados.add(node)
+#função para verificar se o grafo é planar
+def is_planar_advanced(grafo):
+    return verificar_planaridade(grafo)['planar']
 
-        for neighbor in grafo[node]:
-            if neighbor not in visitados:
-                queue.append(neighbor)
+#função para verificar se o grafo contém ciclos
+def verifica_ciclo(grafo):
+    return classificar_aciclicidade(grafo)['ciclico']
 
-    return len(visitados) == len(grafo)
+# Função para verificar se um grafo é conexo
+def verifica_conexo(grafo):
+    g = para_compacto(grafo)
+    if not g.number_of_nodes():
+        return False  # Grafo vazio não é conexo
+    return rotular_componentes(g).quantidade == 1
 
-# Função para verificar se um grafo é bipartido
+# Função para verificar se um grafo é bipartido (todas as componentes, não só a primeira)
 def is_bipartite(grafo):
-    if not grafo:
+    g = para_compacto(grafo)
+    if not g.number_of_nodes():
         return False  # Grafo vazio não é bipartido
+    return rotular_componentes(g).todas_bipartidas()
 
-    color = {}
-    queue = [next(iter(grafo))]  # Inicie o BFS a partir de um vértice qualquer
-    color[queue[0]] = 0  # Atribua a cor 0 ao primeiro vértice
-
-    while queue:
-        node = queue.pop(0)
 
-        for neighbor in grafo[node]:
-            if neighbor not in color:
-                color[neighbor] = 1 - color[node]
-                queue.append(neighbor)
-            elif color[neighbor] == color[node]:
-                return False  # Dois vértices adjacentes têm a mesma cor, não é bipartido
-
-    return True
-
-
-# Função para verificar se um grafo é completo
+# Função para verificar se um grafo é completo: todo par de vértices distintos é adjacente.
+# O GrafoCompacto não tem arestas repetidas, então basta comparar E (sem laços) com V(V-1)/2, em O(1).
+# Laços não contam e o peso da aresta não importa (uma aresta de peso 0 continua sendo aresta).
 def is_completo(grafo):
-    # Verifica todos os pares de vértices
-    vertices = grafo.nodes()
-    for u in vertices:
-        for v in vertices:
-            # Se u e v são diferentes e não existe uma aresta entre eles, o grafo não é completo
-            if u != v and not grafo.has_edge(u, v):
-                return False
-    # Se nenhum par de vértices não tiver uma aresta, o grafo é completo
-    return True
-
-# Função para verificar se um grafo é euleriano
-def is_eulerian(grafo):
-    # Verifica se o grafo é conexo
-    if not verifica_conexo(grafo):
-        # Se não for conexo, não pode ser euleriano
+    if isinstance(grafo, GrafoIncremental):
+        return grafo.completo()
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    return g.number_of_edges() - g.lacos() == n * (n - 1) // 2
+
+# Quantas arestas faltam para o grafo ficar completo (arestas do complemento, sem laços)
+def arestas_complemento(grafo):
+    if isinstance(grafo, GrafoIncremental):
+        return grafo.arestas_complemento()
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    return n * (n - 1) // 2 - (g.number_of_edges() - g.lacos())
+
+# Verifica se o grafo é regular (todos os graus iguais) ou, se k for dado, k-regular. O(V).
+# Os graus seguem a convenção do networkx (um laço soma 2).
+def is_regular(grafo, k=None):
+    if isinstance(grafo, GrafoIncremental):
+        return grafo.regular(k)
+    g = para_compacto(grafo)
+    if not g.number_of_nodes():
         return False
-
-    # Verifica se todos os vértices têm grau par
-    for node in grafo.nodes():
-        if grafo.degree(node) % 2 != 0:
-            # Se algum vértice tiver grau ímpar, o grafo não é euleriano
-            return False
-
-    # Se todos os vértices tiverem grau par, o grafo é euleriano
-    return True
+    graus = g.graus()
+    if k is None:
+        k = graus[0]
+    return bool(np.all(graus == k))
+
+# Percorre, sob demanda, os pares de vértices distintos que não são adjacentes (rótulos),
+# parando depois de "limite" pares. Só os vértices com grau menor que V - 1 são examinados,
+# cada um em O(V), então o primeiro par sai sem olhar o grafo inteiro.
+def arestas_faltantes(grafo, limite=None):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    if limite is not None and limite <= 0:
+        return
+    incompletos = np.flatnonzero(g.graus_sem_lacos() < n - 1).tolist()
+    entregues = 0
+    for u in incompletos:
+        vizinho = np.zeros(n, dtype=bool)
+        vizinho[g.vizinhos_de(u)] = True
+        # Só v > u, para que cada par apareça uma única vez
+        vizinho[:u + 1] = True
+        for v in np.flatnonzero(~vizinho).tolist():
+            yield g.rotulos[u], g.rotulos[v]
+            entregues += 1
+            if limite is not None and entregues >= limite:
+                return
+
+# Primeiro par de vértices não adjacentes (testemunha de que o grafo não é completo), ou None
+def primeiro_par_faltante(grafo):
+    if isinstance(grafo, GrafoIncremental):
+        return grafo.primeiro_par_faltante()
+    return next(arestas_faltantes(grafo, 1), None)
+
+# Classifica o grafo quanto a percursos eulerianos: 'circuito' se todas as arestas podem ser
+# percorridas uma única vez voltando ao início, 'caminho' se isso só é possível terminando em
+# outro vértice (exatamente dois vértices de grau ímpar), None se nenhum dos dois existe.
+# Vértices isolados não atrapalham: basta que as arestas estejam todas em uma só componente.
+@instrumentar('euleriano')
+def classificar_euleriano(grafo):
+    g = para_compacto(grafo)
+    if not g.number_of_nodes():
+        return None
+    graus = g.graus()
+    contar_visitas(vertices=len(graus))
+    # A paridade é O(V) e não precisa da rotulação de componentes; ela vem primeiro
+    impares = int(np.count_nonzero(graus % 2))
+    if impares not in (0, 2):
+        return None
+    com_arestas = rotular_componentes(g).componente[graus > 0]
+    if len(com_arestas) and np.any(com_arestas != com_arestas[0]):
+        return None
+    return 'circuito' if impares == 0 else 'caminho'
+
+# Quantidade máxima de vértices do percurso euleriano exibidos no menu
+LIMITE_PERCURSO_EXIBIDO = 50
+
+# Função para verificar se um grafo é euleriano (tem circuito euleriano)
+def is_eulerian(grafo):
+    return classificar_euleriano(grafo) == 'circuito'
+
+# Para cada entrada i do CSR (u -> v), a posição da entrada v -> u da mesma aresta;
+# um laço aponta para si mesmo. Calculado de forma vetorizada em O(E log E).
+def _entradas_reversas(g):
+    n = max(g.number_of_nodes(), 1)
+    origem = np.repeat(np.arange(g.number_of_nodes(), dtype=np.int64), np.diff(g.offsets))
+    chave = origem * n + g.vizinhos
+    ordem = np.argsort(chave, kind='stable')
+    posicao = np.searchsorted(chave[ordem], g.vizinhos * n + origem)
+    return ordem[posicao]
+
+# Percorre o circuito (ou caminho) euleriano com o algoritmo de Hierholzer, sem recursão:
+# uma pilha de (vértice, entrada usada para chegar nele), um ponteiro por vértice para a próxima
+# entrada ainda não examinada e um bytearray de entradas já usadas (marcando os dois sentidos
+# da aresta). Cada entrada é examinada uma única vez, então o custo total é O(E).
+# As arestas são geradas como (origem, destino, peso) à medida que saem da pilha, formando um
+# percurso contínuo; em um caminho, ele vai de um vértice de grau ímpar até o outro.
+def percorrer_euleriano(grafo):
+    g = para_compacto(grafo)
+    tipo = classificar_euleriano(g)
+    if tipo is None:
+        raise ValueError("O grafo não tem circuito nem caminho euleriano.")
+    graus = g.graus()
+    if not g.number_of_edges():
+        return
+    if tipo == 'caminho':
+        inicio = int(np.flatnonzero(graus % 2)[0])
+    else:
+        inicio = int(np.flatnonzero(graus)[0])
+
+    rotulos = g.rotulos
+    offsets, vizinhos = g.adjacencia()
+    pesos = memoryview(g.pesos)
+    reversa = memoryview(_entradas_reversas(g))
+    proxima = list(offsets[:-1])
+    usada = bytearray(len(vizinhos))
+
+    pilha = [(inicio, -1)]
+    while pilha:
+        v, entrada = pilha[-1]
+        i = proxima[v]
+        fim = offsets[v + 1]
+        while i < fim and usada[i]:
+            i += 1
+        if i < fim:
+            proxima[v] = i + 1
+            usada[i] = 1
+            usada[reversa[i]] = 1
+            pilha.append((vizinhos[i], i))
+        else:
+            proxima[v] = i
+            pilha.pop()
+            if entrada >= 0:
+                yield rotulos[v], rotulos[pilha[-1][0]], pesos[entrada]
 
 #função para verificar se um grafo é uma árvore
 def is_tree(grafo):
-    # Verifica se o grafo é conexo
-    if not verifica_conexo(grafo):
-        return False  # O grafo não é conexo, portanto, não é uma árvore
-
-    # Conjunto para rastrear nós visitados durante o BFS
-    visited = set()
-    # Lista para armazenar os nós do grafo
-    nodes = list(grafo.nodes())  # Converte a visualização dos nós em uma lista
-    # Fila para o algoritmo BFS, iniciando a partir do primeiro vértice da lista
-    queue = [(nodes[0], None)]  
-
-    while queue:
-        # Pop o próximo nó e seu pai da fila
-        node, parent = queue.pop(0)
-        # Adiciona o nó ao conjunto de visitados
-        visited.add(node)
-
-        # Itera sobre os vizinhos do nó atual
-        for neighbor in grafo.neighbors(node):
-            if neighbor != parent:
-                # Se o vizinho não é o pai do nó atual
-                if neighbor in visited:
-                    return False  # Encontrou um ciclo, portanto, não é uma árvore
-                # Adiciona o vizinho à fila junto com o nó atual como pai
-                queue.append((neighbor, node))
-
-    return len(visited) == len(nodes)  # Verifique se todos os nós foram visitados
-
-#função para verificar se o grafo contém um caminhop hamiltoniano
-def is_hamiltonian(grafo):
-    def hamiltonian_ciclo_util(v, visitados, caminho):
-        # Marca o vértice como visitado e adiciona ao caminho
-        visitados[v] = True
-        caminho.append(v)
-
-        if len(caminho) == grafo.number_of_nodes():
-            # Verifica se o último vértice no caminho tem uma aresta para o primeiro vértice
-            if grafo.has_edge(caminho[-1], caminho[0]):
-                return True
-            else:
-                return False
-
-        # Explora todos os vizinhos não visitados do vértice atual
-        for vizinho in grafo.neighbors(v):
-            if not visitados[vizinho]:
-                if hamiltonian_ciclo_util(vizinho, visitados, caminho):
+    return classificar_aciclicidade(grafo)['arvore']
+
+# Tempo máximo (em segundos) da busca por ciclo hamiltoniano
+TEMPO_LIMITE_HAMILTONIANO = 10.0
+# Até este número de vértices a busca usa a programação dinâmica de Held-Karp
+LIMITE_HELD_KARP = 20
+# Até este número de vértices vale a pena testar a condição de Ore (O(V²))
+LIMITE_ORE = 2000
+
+# Indica se a busca deve parar (prazo esgotado, evento de cancelamento ou tarefa cancelada)
+def _interromper(prazo, cancelar):
+    return (time.perf_counter() > prazo or (cancelar is not None and cancelar.is_set())
+            or tarefa_cancelada())
+
+# Verifica se o subgrafo induzido pelos vértices ativos (mais a aresta extra, se houver)
+# é desconexo ou tem ponto de articulação, usando Tarjan iterativo a partir da raiz.
+def _tem_corte(adjacencia, ativo, total_ativos, raiz, aresta_extra=None):
+    if total_ativos <= 2:
+        return False
+    a, b = aresta_extra if aresta_extra is not None else (-1, -1)
+
+    def vizinhos_de(v):
+        if v == a:
+            yield b
+        if v == b:
+            yield a
+        for w in adjacencia[v]:
+            if ativo[w]:
+                yield w
+
+    descoberta = {raiz: 0}
+    menor = {raiz: 0}
+    filhos_raiz = 0
+    pilha = [(raiz, -1, vizinhos_de(raiz))]
+    while pilha:
+        v, pai, vizinhos_v = pilha[-1]
+        for w in vizinhos_v:
+            if w == pai or w == v:
+                continue
+            if w not in descoberta:
+                descoberta[w] = menor[w] = len(descoberta)
+                pilha.append((w, v, vizinhos_de(w)))
+                break
+            if descoberta[w] < menor[v]:
+                menor[v] = descoberta[w]
+        else:
+            pilha.pop()
+            if pilha:
+                u = pilha[-1][0]
+                if menor[v] < menor[u]:
+                    menor[u] = menor[v]
+                if u == raiz:
+                    filhos_raiz += 1
+                elif menor[v] >= descoberta[u]:
                     return True
+    return filhos_raiz > 1 or len(descoberta) < total_ativos
 
-        # Se o vértice atual não levar a uma solução, retroceda
-        visitados[v] = False
-        caminho.pop()
+# Confere se a sequência de vértices é um ciclo hamiltoniano: passa por todos uma vez só e
+# cada par consecutivo (incluindo o último com o primeiro) é uma aresta
+def _ciclo_valido(vizinhanca, ciclo):
+    n = len(vizinhanca)
+    if len(ciclo) != n or len(set(ciclo)) != n:
         return False
+    return all(ciclo[(i + 1) % n] in vizinhanca[ciclo[i]] for i in range(n))
+
+# Algoritmo de Palmer: sob a condição de Ore, desfaz as "lacunas" de uma ordem qualquer dos
+# vértices com reversões até obter um ciclo hamiltoniano. O(V²) testes de adjacência.
+def _ciclo_palmer(vizinhanca):
+    n = len(vizinhanca)
+    ciclo = list(range(n))
+    mudou = True
+    while mudou:
+        mudou = False
+        for i in range(n):
+            a, b = ciclo[i], ciclo[(i + 1) % n]
+            if b in vizinhanca[a]:
+                continue
+            # Procura j com a~ciclo[j] e b~ciclo[j+1] e inverte o trecho entre eles
+            for k in range(2, n - 1):
+                j = (i + k) % n
+                c, d = ciclo[j], ciclo[(j + 1) % n]
+                if c in vizinhanca[a] and d in vizinhanca[b]:
+                    # Gira o ciclo para que a lacuna fique na posição 0 e inverte ciclo[1..k]
+                    ciclo = ciclo[i:] + ciclo[:i]
+                    ciclo[1:k + 1] = ciclo[k:0:-1]
+                    mudou = True
+                    break
+            if mudou:
+                break
+    return ciclo
+
+# Held-Karp com bitmask, vetorizado por camadas de popcount: dp[mascara] guarda, como bits,
+# os vértices onde pode terminar um caminho que sai do vértice 0 e visita exatamente "mascara"
+# (vértices 1..n-1). Devolve o ciclo (lista de ids locais), [] se não existe, ou None se interrompido.
+def _held_karp(vizinhanca, prazo, cancelar):
+    n = len(vizinhanca)
+    bits = n - 1
+    adj = [0] * n
+    for v in range(n):
+        for w in vizinhanca[v]:
+            if w:
+                adj[v] |= 1 << (w - 1)
+    mascaras = np.arange(1 << bits, dtype=np.int64)
+    popcount = np.zeros(len(mascaras), dtype=np.int64)
+    for i in range(bits):
+        popcount += (mascaras >> i) & 1
+    camadas = np.argsort(popcount, kind='stable')
+    fronteiras = np.searchsorted(popcount[camadas], np.arange(bits + 2))
+    dp = np.zeros(len(mascaras), dtype=np.int64)
+    for w in vizinhanca[0]:
+        if w:
+            dp[1 << (w - 1)] = 1 << (w - 1)
+
+    for tamanho in range(2, bits + 1):
+        if _interromper(prazo, cancelar):
+            return None
+        informar_progresso(camada=tamanho, camadas=bits)
+        camada = camadas[fronteiras[tamanho]:fronteiras[tamanho + 1]]
+        resultado = np.zeros(len(camada), dtype=np.int64)
+        for v in range(bits):
+            bit = 1 << v
+            contem = (camada & bit) != 0
+            anteriores = dp[camada[contem] ^ bit]
+            # v pode fechar o caminho se algum fim anterior for vizinho de v
+            alcanca = (anteriores & adj[v + 1]) != 0
+            resultado[contem] |= np.where(alcanca, bit, 0)
+        dp[camada] = resultado
+
+    # Fecha o ciclo em um fim vizinho do vértice 0 e reconstrói o caminho de trás para a frente
+    mascara = (1 << bits) - 1
+    fins = int(dp[mascara]) & adj[0]
+    if not fins:
+        return []
+    v = (fins & -fins).bit_length() - 1
+    caminho = [v + 1]
+    while mascara != 1 << v:
+        mascara ^= 1 << v
+        fins = int(dp[mascara]) & adj[v + 1]
+        v = (fins & -fins).bit_length() - 1
+        caminho.append(v + 1)
+    return [0] + caminho[::-1]
+
+# Backtracking iterativo com início fixo e podas:
+#  - um vizinho do fim do caminho com só 2 vizinhos restantes é obrigatoriamente o próximo
+#    (dois desses ao mesmo tempo é beco sem saída), exceto enquanto o fim ainda é o início;
+#  - os vértices restantes mais a aresta virtual fim-início precisam formar um grafo
+#    2-conexo (conexo e sem ponto de articulação), senão não há caminho hamiltoniano entre eles.
+# Devolve o ciclo (lista de ids), [] se a busca foi esgotada, ou None se interrompida.
+def _backtracking_hamiltoniano(vizinhanca, prazo, cancelar):
+    n = len(vizinhanca)
+    inicio = min(range(n), key=lambda v: len(vizinhanca[v]))
+    no_caminho = bytearray(n)
+    # ativo = ainda pode receber arestas do ciclo: fora do caminho, o fim atual ou o início
+    ativo = bytearray([1]) * n
+    restantes = [len(vizinhanca[v]) for v in range(n)]
+    caminho = [inicio]
+    no_caminho[inicio] = 1
+
+    def candidatos(fim):
+        livres = [w for w in vizinhanca[fim] if not no_caminho[w]]
+        # No início ainda faltam as duas arestas do ciclo, então não há sucessor obrigatório
+        if fim != inicio:
+            forcados = [w for w in livres if restantes[w] == 2]
+            if len(forcados) > 1:
+                return []
+            if forcados:
+                return forcados
+        # Tenta primeiro quem tem menos saídas (heurística de Warnsdorff); pop() pega o último
+        return sorted(livres, key=lambda w: -restantes[w])
+
+    # Cada quadro guarda as opções do vértice e se ele tinha uma única saída possível
+    pilha = [(candidatos(inicio), False)]
+    passos = 0
+    try:
+        while pilha:
+            passos += 1
+            if passos & 255 == 0:
+                if _interromper(prazo, cancelar):
+                    return None
+                informar_progresso(nos_expandidos=passos, profundidade=len(caminho))
+            opcoes, forcado = pilha[-1]
+            if not opcoes:
+                # Opções esgotadas: desfaz o último vértice do caminho
+                pilha.pop()
+                x = caminho.pop()
+                no_caminho[x] = 0
+                if caminho and caminho[-1] != inicio:
+                    fim = caminho[-1]
+                    ativo[fim] = 1
+                    for w in vizinhanca[fim]:
+                        restantes[w] += 1
+                continue
+
+            x = opcoes.pop()
+            fim = caminho[-1]
+            # O fim atual vira vértice interno do caminho (o início continua como extremidade)
+            if fim != inicio:
+                ativo[fim] = 0
+                for w in vizinhanca[fim]:
+                    restantes[w] -= 1
+            caminho.append(x)
+            no_caminho[x] = 1
+
+            if len(caminho) == n:
+                if inicio in vizinhanca[x]:
+                    return caminho
+                proximos = []
+            elif forcado:
+                proximos = candidatos(x)
+            else:
+                # O teste de corte é O(V+E): só roda depois de uma escolha livre, não em movimentos
+                # forçados. Em grafos grandes poucos testes já somam segundos, então o prazo é
+                # conferido antes de cada um
+                if _interromper(prazo, cancelar):
+                    return None
+                if _tem_corte(vizinhanca, ativo, n - len(caminho) + 2, x, (x, inicio)):
+                    proximos = []
+                else:
+                    proximos = candidatos(x)
+            pilha.append((proximos, len(proximos) == 1))
+        return []
+    finally:
+        # Passos da busca = vértices colocados no caminho (para a instrumentação)
+        contar_visitas(vertices=passos)
+
+# Procura um ciclo hamiltoniano. Antes de qualquer busca aplica testes baratos:
+# necessários (conexo, grau mínimo 2, sem ponte/articulação, bipartição equilibrada) e
+# suficientes (Dirac, Ore, resolvidos de forma construtiva pelo algoritmo de Palmer).
+# Devolve um dicionário com 'hamiltoniano' (True, False ou None se o prazo acabou ou a busca
+# foi cancelada), 'ciclo' (rótulos, quando encontrado) e 'motivo'.
+@instrumentar('hamiltoniano')
+@memorizar_propriedade
+def buscar_ciclo_hamiltoniano(grafo, tempo_limite=TEMPO_LIMITE_HAMILTONIANO, cancelar=None):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    prazo = time.perf_counter() + tempo_limite
+
+    def resposta(hamiltoniano, motivo, ciclo=None):
+        if ciclo is not None:
+            ciclo = [g.rotulos[v] for v in ciclo]
+        return {'hamiltoniano': hamiltoniano, 'ciclo': ciclo, 'motivo': motivo}
+
+    if n < 3:
+        return resposta(False, "um ciclo hamiltoniano precisa de pelo menos 3 vértices")
+    # Os testes necessários usam só os vetores CSR, antes de montar qualquer estrutura por vértice
+    if int(g.graus_sem_lacos().min()) < 2:
+        return resposta(False, "há vértice com grau menor que 2")
+    componentes = rotular_componentes(g)
+    if componentes.quantidade > 1:
+        return resposta(False, "o grafo não é conexo")
+    if componentes.bipartida(0):
+        lado_a, lado_b = componentes.biparticao(0)
+        if len(lado_a) != len(lado_b):
+            return resposta(False, "grafo bipartido com lados de tamanhos diferentes")
+    # Uma ponte ou um ponto de articulação impedem qualquer ciclo que passe por todos os vértices;
+    # o índice estrutural é o mesmo usado pela planaridade e pela coloração
+    if indice_estrutural(g).tem_corte:
+        return resposta(False, "o grafo tem ponte ou ponto de articulação")
+
+    # Vizinhanças como conjuntos, sem laços (laços nunca fazem parte de um ciclo hamiltoniano)
+    offsets, vizinhos = g.adjacencia()
+    vizinhanca = [set(vizinhos[offsets[v]:offsets[v + 1]]) - {v} for v in range(n)]
+    grau = [len(vizinhos_v) for vizinhos_v in vizinhanca]
+    contar_visitas(n, g.number_of_edges())
+
+    # Condições suficientes; o ciclo é construído pelo algoritmo de Palmer e conferido antes de
+    # ser devolvido (se não fechar, a busca exata decide)
+    suficiente = None
+    if 2 * min(grau) >= n:
+        suficiente = "condição de Dirac (grau mínimo >= n/2)"
+    elif n <= LIMITE_ORE:
+        # Ore: todo par não adjacente soma pelo menos n; pares com os dois graus >= n/2 já somam
+        ore = all(grau[u] + grau[v] >= n
+                  for u in range(n)
+                  for v in range(u + 1, n) if v not in vizinhanca[u] and 2 * min(grau[u], grau[v]) < n)
+        if ore:
+            suficiente = "condição de Ore"
+    if suficiente is not None:
+        ciclo = _ciclo_palmer(vizinhanca)
+        if _ciclo_valido(vizinhanca, ciclo):
+            return resposta(True, suficiente, ciclo)
+
+    if n <= LIMITE_HELD_KARP:
+        ciclo = _held_karp(vizinhanca, prazo, cancelar)
+        metodo = "programação dinâmica de Held-Karp"
+    else:
+        ciclo = _backtracking_hamiltoniano(vizinhanca, prazo, cancelar)
+        metodo = "backtracking com podas"
+    if ciclo is None:
+        return resposta(None, f"busca interrompida ({metodo}): prazo esgotado ou cancelada")
+    if not ciclo:
+        return resposta(False, f"nenhum ciclo encontrado ({metodo})")
+    if not _ciclo_valido(vizinhanca, ciclo):
+        return resposta(None, f"a busca ({metodo}) devolveu um ciclo inválido")
+    return resposta(True, f"ciclo encontrado ({metodo})", ciclo)
+
+#função para verificar se o grafo contém um ciclo hamiltoniano
+# Só devolve True com um ciclo de fato encontrado; se o prazo acabar, devolve False
+# (use buscar_ciclo_hamiltoniano para distinguir "não é" de "não decidido")
+def is_hamiltonian(grafo, tempo_limite=TEMPO_LIMITE_HAMILTONIANO):
+    return buscar_ciclo_hamiltoniano(grafo, tempo_limite)['hamiltoniano'] is True
+
+# Até quantos vértices as distâncias entre todos os pares são calculadas (matriz n x n densa)
+LIMITE_TODOS_PARES = 500
+# Quantidade máxima de células (origens x vértices) da matriz de distâncias de um lote de origens
+LIMITE_CELULAS_LOTE = 1 << 24
+# Quantas origens são usadas para estimar o diâmetro ponderado de grafos grandes
+ORIGENS_AMOSTRA_DIAMETRO = 16
+
+# Converte um número do NumPy em int (quando inteiro) ou float, para sair em JSON
+def _numero(valor):
+    valor = float(valor)
+    return int(valor) if valor.is_integer() else valor
+
+# Pesos negativos invalidam Dijkstra e a relaxação em lote; são recusados logo de início
+def _verificar_pesos(g):
+    if len(g.pesos) and g.pesos.min() < 0:
+        raise ValueError("O grafo tem arestas com peso negativo.")
+
+# Arestas do grafo como vetores de ids (origem < destino, sem laços) e o vetor de pesos
+def _vetores_de_arestas(g):
+    origem = np.repeat(np.arange(g.number_of_nodes(), dtype=np.int64), np.diff(g.offsets))
+    manter = origem < g.vizinhos
+    return origem[manter], g.vizinhos[manter], g.pesos[manter]
+
+# Dijkstra com heap binário sobre os ids internados. Devolve os vetores de distância (inf quando
+# inalcançável) e de predecessor (-1 na origem e nos inalcançáveis). Se o destino for dado,
+# para assim que ele sai do heap.
+def _dijkstra(g, origem, destino=None):
+    n = g.number_of_nodes()
+    offsets, vizinhos = g.adjacencia()
+    pesos = memoryview(g.pesos)
+    distancia = [float('inf')] * n
+    pai = [-1] * n
+    fechado = bytearray(n)
+    distancia[origem] = 0
+    heap = [(0, origem)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if fechado[v]:
+            continue
+        fechado[v] = 1
+        if v == destino:
+            break
+        for i in range(offsets[v], offsets[v + 1]):
+            w = vizinhos[i]
+            nova = d + pesos[i]
+            if nova < distancia[w]:
+                distancia[w] = nova
+                pai[w] = v
+                heapq.heappush(heap, (nova, w))
+    fechados = np.frombuffer(fechado, dtype=np.uint8).astype(bool)
+    contar_visitas(int(fechados.sum()), int(np.diff(g.offsets)[fechados].sum()))
+    return np.array(distancia, dtype=np.float64), pai
+
+# Caminho mínimo ponderado entre dois rótulos. Devolve {'distancia', 'caminho'} com a lista de
+# rótulos do caminho, ou distancia inf e caminho None se o destino não for alcançável.
+@instrumentar('caminho_minimo')
+def caminho_minimo(grafo, origem, destino):
+    g = para_compacto(grafo)
+    _verificar_pesos(g)
+    s, t = g.indice[origem], g.indice[destino]
+    distancia, pai = _dijkstra(g, s, t)
+    if distancia[t] == np.inf:
+        return {'distancia': float('inf'), 'caminho': None}
+    caminho = [t]
+    while caminho[-1] != s:
+        caminho.append(pai[caminho[-1]])
+    return {'distancia': _numero(distancia[t]), 'caminho': [g.rotulos[v] for v in reversed(caminho)]}
+
+# Distâncias entre todos os pares (Floyd-Warshall vetorizado: uma operação n x n por vértice
+# intermediário). Só para grafos pequenos; devolve a matriz n x n indexada pelos ids.
+@instrumentar('distancias.todos_pares')
+def distancias_todos_pares(grafo):
+    g = para_compacto(grafo)
+    _verificar_pesos(g)
+    n = g.number_of_nodes()
+    if n > LIMITE_TODOS_PARES:
+        raise ValueError(f"Distâncias entre todos os pares só para até {LIMITE_TODOS_PARES} vértices; "
+                         "use distancias_multiplas_origens.")
+    distancia = np.full((n, n), np.inf)
+    origens, destinos, pesos = _vetores_de_arestas(g)
+    contar_visitas(n, len(origens))
+    distancia[origens, destinos] = pesos
+    distancia[destinos, origens] = pesos
+    np.fill_diagonal(distancia, 0)
+    for k in range(n):
+        np.minimum(distancia, distancia[:, k, None] + distancia[None, k, :], out=distancia)
+    return distancia
+
+# Distâncias de várias origens (ids) a todos os vértices, para grafos grandes: em vez de um
+# Dijkstra por origem, as origens são processadas em lotes e cada rodada relaxa de uma vez,
+# com operações vetorizadas, todas as arestas que saem dos vértices cuja distância melhorou
+# (Bellman-Ford por fronteira). Devolve a matriz len(origens) x n.
+@instrumentar('distancias.multiplas_origens')
+def distancias_multiplas_origens(grafo, origens):
+    g = para_compacto(grafo)
+    _verificar_pesos(g)
+    n = g.number_of_nodes()
+    origens = np.asarray(origens, dtype=np.int64)
+    graus = np.diff(g.offsets)
+    resultado = np.full((len(origens), n), np.inf)
+    lote = max(1, LIMITE_CELULAS_LOTE // max(n, 1))
+    for inicio in range(0, len(origens), lote):
+        bloco = origens[inicio:inicio + lote]
+        k = len(bloco)
+        distancia = np.full(k * n, np.inf)
+        # Fronteira como índices planos (linha * n + vértice) da matriz do lote; a máscara
+        # remove as repetições sem ordenar (mais barato que np.unique em vetores grandes)
+        fronteira = np.arange(k, dtype=np.int64) * n + bloco
+        distancia[fronteira] = 0
+        marcado = np.zeros(k * n, dtype=bool)
+        while len(fronteira):
+            linha, v = np.divmod(fronteira, n)
+            # Expande os intervalos CSR de todos os vértices da fronteira de uma vez
+            quantidade = graus[v]
+            total = int(quantidade.sum())
+            contar_visitas(len(fronteira), total)
+            if not total:
+                break
+            base = np.repeat(g.offsets[v] - np.cumsum(quantidade) + quantidade, quantidade)
+            entradas = base + np.arange(total, dtype=np.int64)
+            alvo = np.repeat(linha, quantidade) * n + g.vizinhos[entradas]
+            candidata = np.repeat(distancia[fronteira], quantidade) + g.pesos[entradas]
+            melhora = candidata < distancia[alvo]
+            alvo, candidata = alvo[melhora], candidata[melhora]
+            np.minimum.at(distancia, alvo, candidata)
+            marcado[alvo] = True
+            fronteira = np.flatnonzero(marcado)
+            marcado[fronteira] = False
+        resultado[inicio:inicio + k] = distancia.reshape(k, n)
+    return resultado
+
+# Raiz do conjunto de v no union-find (lista de pais), com compressão de caminho por divisão
+def _raiz(pai, v):
+    while pai[v] != v:
+        pai[v] = pai[pai[v]]
+        v = pai[v]
+    return v
+
+# Árvore (floresta) geradora mínima por Kruskal (arestas ordenadas + union-find por tamanho) ou
+# por Prim (heap binário, recomeçando em cada componente). Laços são ignorados.
+# Devolve {'peso', 'arestas': [(origem, destino, peso)], 'componentes'}.
+@instrumentar('arvore_geradora_minima')
+def arvore_geradora_minima(grafo, metodo='kruskal'):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    escolhidas = []
+    if metodo == 'kruskal':
+        origens, destinos, pesos = _vetores_de_arestas(g)
+        ordem = np.argsort(pesos, kind='stable')
+        pai = list(range(n))
+        tamanho = [1] * n
+        for u, v, peso in zip(origens[ordem].tolist(), destinos[ordem].tolist(), pesos[ordem].tolist()):
+            ru, rv = _raiz(pai, u), _raiz(pai, v)
+            if ru == rv:
+                continue
+            if tamanho[ru] < tamanho[rv]:
+                ru, rv = rv, ru
+            pai[rv] = ru
+            tamanho[ru] += tamanho[rv]
+            escolhidas.append((u, v, peso))
+            if len(escolhidas) == n - 1:
+                break
+    elif metodo == 'prim':
+        offsets, vizinhos = g.adjacencia()
+        pesos = memoryview(g.pesos)
+        na_arvore = bytearray(n)
+        for raiz in range(n):
+            if na_arvore[raiz]:
+                continue
+            na_arvore[raiz] = 1
+            heap = [(pesos[i], raiz, vizinhos[i]) for i in range(offsets[raiz], offsets[raiz + 1])]
+            heapq.heapify(heap)
+            while heap:
+                peso, u, v = heapq.heappop(heap)
+                if na_arvore[v]:
+                    continue
+                na_arvore[v] = 1
+                escolhidas.append((u, v, peso))
+                for i in range(offsets[v], offsets[v + 1]):
+                    if not na_arvore[vizinhos[i]]:
+                        heapq.heappush(heap, (pesos[i], v, vizinhos[i]))
+    else:
+        raise ValueError(f"Método desconhecido: {metodo}")
+    contar_visitas(n, g.number_of_edges())
+
+    rotulos = g.rotulos
+    return {
+        'peso': _numero(sum(peso for _, _, peso in escolhidas)),
+        'arestas': [(rotulos[u], rotulos[v], peso) for u, v, peso in escolhidas],
+        'componentes': n - len(escolhidas),
+    }
+
+# Resumo da análise ponderada, com tipos simples para o modo em lote: soma e extremos dos pesos,
+# peso da árvore geradora mínima e diâmetro ponderado (maior distância finita entre dois vértices).
+# Até LIMITE_TODOS_PARES vértices o diâmetro é exato; acima disso é um limite inferior obtido das
+# distâncias a partir de uma amostra de origens (os vértices de maior grau), calculadas em lote.
+@instrumentar('pesos')
+@memorizar_propriedade
+def analisar_pesos(grafo):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    _, _, pesos = _vetores_de_arestas(g)
+    contar_visitas(arestas=len(pesos))
+    resultado = {'peso_total': _numero(pesos.sum()) if len(pesos) else 0}
+    if not len(pesos):
+        return resultado
+    resultado['peso_minimo'] = _numero(pesos.min())
+    resultado['peso_maximo'] = _numero(pesos.max())
+    agm = arvore_geradora_minima(g)
+    resultado['arvore_geradora_minima'] = {'peso': agm['peso'], 'arestas': len(agm['arestas'])}
+    if pesos.min() < 0:
+        # Caminhos mínimos com pesos negativos ficam fora do escopo
+        return resultado
+    if n <= LIMITE_TODOS_PARES:
+        distancias = distancias_todos_pares(g)
+        resultado['diametro_exato'] = True
+    else:
+        amostra = np.argsort(-g.graus(), kind='stable')[:ORIGENS_AMOSTRA_DIAMETRO]
+        distancias = distancias_multiplas_origens(g, amostra)
+        resultado['diametro_exato'] = False
+    resultado['diametro_ponderado'] = _numero(distancias[np.isfinite(distancias)].max())
+    return resultado
+
+# Propriedades caras de analisar_tudo, as que ficam em 'tempo_esgotado' quando o alarme do lote vence
+PROPRIEDADES_CARAS = ('planar', 'cromatico', 'hamiltoniano')
+
+# Analisa todas as propriedades de uma vez, compartilhando o vetor de graus e a rotulação de
+# componentes e pulando o que já está implícito (uma floresta é bipartida e planar, um grafo
+# sem arestas tem número cromático 1, um grafo desconexo não é hamiltoniano).
+# Devolve um dicionário só com tipos simples (int, bool, str, listas), pronto para json.dumps.
+# tempo_limite é o prazo das buscas exatas juntas: o número cromático recebe metade do que resta
+# quando ele começa e a busca do ciclo hamiltoniano, o que sobrar depois.
+# Se um alarme do lote (TimeoutError) interromper a análise, devolve o que já foi calculado e
+# lista em 'tempo_esgotado' as propriedades caras que ficaram sem resposta (valem None).
+@instrumentar('analise')
+@memorizar_propriedade
+def analisar_tudo(grafo, tempo_limite=TEMPO_LIMITE_CROMATICO):
+    resultado = {}
+    try:
+        _preencher_analise(para_compacto(grafo), resultado, time.perf_counter() + tempo_limite)
+    except TimeoutError:
+        resultado['tempo_esgotado'] = [campo for campo in PROPRIEDADES_CARAS if campo not in resultado]
+        for campo in resultado['tempo_esgotado']:
+            resultado[campo] = None
+    return resultado
+
+# Corpo de analisar_tudo: preenche "resultado" propriedade a propriedade, para que uma
+# interrupção deixe nele tudo o que já foi respondido
+def _preencher_analise(g, resultado, prazo):
+    n = g.number_of_nodes()
+    m = g.number_of_edges()
+    graus = g.graus()
+    lacos = g.lacos()
+    resultado.update({'vertices': n, 'arestas': m, 'lacos': lacos})
+    contar_visitas(vertices=n)
+    if not n:
+        return
+
+    resultado['grau_minimo'] = int(graus.min())
+    resultado['grau_maximo'] = int(graus.max())
+    impares = int(np.count_nonzero(graus % 2))
+    resultado['vertices_grau_impar'] = impares
+
+    componentes = rotular_componentes(g)
+    conexo = componentes.quantidade == 1
+    resultado['componentes'] = componentes.quantidade
+    resultado['maior_componente'] = max(componentes.tamanhos)
+    resultado['conexo'] = conexo
+
+    aciclicidade = classificar_aciclicidade(g)
+    resultado['ciclico'] = aciclicidade['ciclico']
+    resultado['floresta'] = aciclicidade['floresta']
+    resultado['arvore'] = aciclicidade['arvore']
+
+    bipartido = componentes.todas_bipartidas()
+    resultado['bipartido'] = bipartido
+    if not bipartido:
+        c = next(c for c in range(componentes.quantidade) if not componentes.bipartida(c))
+        resultado['ciclo_impar'] = [g.rotulos[v] for v in componentes.ciclo_impar(c)]
+
+    resultado['completo'] = is_completo(g)
+    resultado['arestas_complemento'] = arestas_complemento(g)
+    resultado['regular'] = int(graus[0]) if is_regular(g) else None
+    # Vértices isolados não impedem o percurso euleriano; as arestas é que precisam estar juntas
+    com_arestas = componentes.componente[graus > 0]
+    arestas_juntas = not len(com_arestas) or bool(np.all(com_arestas == com_arestas[0]))
+    resultado['euleriano'] = arestas_juntas and impares == 0
+    resultado['caminho_euleriano'] = arestas_juntas and impares == 2
+
+    if aciclicidade['floresta']:
+        resultado['planar'] = True
+    else:
+        resultado['planar'] = verificar_planaridade(g)['planar']
 
-    # Inicializa a lista de vértices visitados como False
-    visitados = {v: False for v in grafo.nodes}
+    if m == lacos:
+        cromatico = {'limite_inferior': 1, 'limite_superior': 1, 'provado': True}
+    elif bipartido and lacos == 0:
+        cromatico = {'limite_inferior': 2, 'limite_superior': 2, 'provado': True}
+    else:
+        cromatico = calcular_coloracao_exata(g, max(0.0, prazo - time.perf_counter()) / 2)
+    resultado['cromatico'] = {chave: cromatico[chave]
+                              for chave in ('limite_inferior', 'limite_superior', 'provado')}
 
-    # Inicializa o caminho como uma lista vazia
-    caminho = []
+    if not conexo or aciclicidade['floresta']:
+        resultado['hamiltoniano'] = False
+    else:
+        hamiltoniano = buscar_ciclo_hamiltoniano(g, max(0.0, prazo - time.perf_counter()))
+        resultado['hamiltoniano'] = hamiltoniano['hamiltoniano']
+        if hamiltoniano['ciclo'] is not None:
+            resultado['ciclo_hamiltoniano'] = hamiltoniano['ciclo']
+
+# Exibe o resultado de analisar_tudo em forma de relatório
+def exibir_analise(resultado):
+    def sim_nao(valor):
+        return "indefinido" if valor is None else ("sim" if valor else "não")
+
+    print(f"Vértices: {resultado['vertices']}  Arestas: {resultado['arestas']}  Laços: {resultado['lacos']}")
+    if not resultado['vertices']:
+        return
+    print(f"Grau mínimo: {resultado['grau_minimo']}  Grau máximo: {resultado['grau_maximo']}")
+    print(f"Conexo: {sim_nao(resultado['conexo'])} ({resultado['componentes']} componente(s), "
+          f"maior com {resultado['maior_componente']} vértices)")
+    print(f"Cíclico: {sim_nao(resultado['ciclico'])}  Floresta: {sim_nao(resultado['floresta'])}  "
+          f"Árvore: {sim_nao(resultado['arvore'])}")
+    print(f"Bipartido: {sim_nao(resultado['bipartido'])}")
+    print(f"Completo: {sim_nao(resultado['completo'])} "
+          f"({resultado['arestas_complemento']} aresta(s) no complemento)")
+    if resultado['regular'] is not None:
+        print(f"Regular: sim ({resultado['regular']}-regular)")
+    print(f"Euleriano: {sim_nao(resultado['euleriano'])}  "
+          f"Caminho euleriano: {sim_nao(resultado['caminho_euleriano'])} "
+          f"({resultado['vertices_grau_impar']} vértice(s) de grau ímpar)")
+    print(f"Hamiltoniano: {sim_nao(resultado['hamiltoniano'])}")
+    print(f"Planar: {sim_nao(resultado['planar'])}")
+    cromatico = resultado['cromatico']
+    if cromatico['provado']:
+        print(f"Número cromático: {cromatico['limite_superior']} (exato)")
+    else:
+        print(f"Número cromático: entre {cromatico['limite_inferior']} e {cromatico['limite_superior']}")
 
-    # Começa a verificação do ciclo Hamiltoniano a partir do primeiro vértice
-    for v in grafo.nodes:
-        if hamiltonian_ciclo_util(v, visitados, caminho):
-            return True
+# Exibe o resultado de calcular_coloracao_exata
+def exibir_cromatico(cromatico):
+    if cromatico['provado']:
+        print(f"Número cromático do grafo: {cromatico['limite_superior']} (exato)")
+    else:
+        print(f"Número cromático do grafo: entre {cromatico['limite_inferior']} e "
+              f"{cromatico['limite_superior']} (limite de tempo atingido, não provado)")
+
+# Exibe o resultado de buscar_ciclo_hamiltoniano, com o ciclo encontrado ou o motivo
+def exibir_hamiltoniano(hamiltoniano):
+    if hamiltoniano['hamiltoniano']:
+        print(f"O grafo é Hamiltoniano ({hamiltoniano['motivo']}).")
+        print(f"Ciclo: {' - '.join(map(str, hamiltoniano['ciclo']))}")
+    elif hamiltoniano['hamiltoniano'] is False:
+        print(f"O grafo não é Hamiltoniano ({hamiltoniano['motivo']}).")
+    else:
+        print(f"Não foi possível decidir se o grafo é Hamiltoniano ({hamiltoniano['motivo']}).")
 
-    # Se nenhum ciclo Hamiltoniano for encontrado
-    return False
+# Exibe o resultado de verificar_planaridade (com o subgrafo de Kuratowski, se foi procurado)
+def exibir_planaridade(planaridade):
+    if planaridade['planar']:
+        print(f"O grafo é planar ({planaridade['motivo']}).")
+    else:
+        print(f"O grafo não é planar ({planaridade['motivo']}).")
+        if planaridade['kuratowski'] is not None:
+            arestas = ', '.join(f"{u}-{v}" for u, v in planaridade['kuratowski'].edges())
+            print(f"Subgrafo de Kuratowski: {arestas}")
+
+# Exibe o resultado de analisar_estrutura (as listas longas aparecem só no começo)
+def exibir_estrutura(estrutura):
+    def lista(itens):
+        texto = ', '.join(map(str, itens[:LIMITE_PERCURSO_EXIBIDO]))
+        return texto + (", ..." if len(itens) > LIMITE_PERCURSO_EXIBIDO else "")
+
+    pontes = [f"{u}-{v}" for u, v in estrutura['pontes']]
+    print(f"Pontes: {len(pontes)}" + (f" ({lista(pontes)})" if pontes else ""))
+    articulacoes = estrutura['articulacoes']
+    print(f"Pontos de articulação: {len(articulacoes)}" + (f" ({lista(articulacoes)})" if articulacoes else ""))
+    print(f"Blocos (componentes biconexas): {estrutura['blocos']} (maior com {estrutura['maior_bloco']} vértices)")
+    print(f"Árvore de blocos e cortes: {estrutura['blocos'] + len(articulacoes)} nós, "
+          f"{len(estrutura['arvore_blocos_cortes'])} arestas")
+
+# Acima desta quantidade de vértices o desenho agrupa o grafo (configurável por GRAFO_LIMITE_DESENHO)
+LIMITE_VERTICES_DESENHO = int(os.environ.get('GRAFO_LIMITE_DESENHO', 2000))
+# Acima desta quantidade de arestas o desenho mostra só uma amostra delas
+LIMITE_ARESTAS_DESENHO = 20000
+# Cores usadas para destacar componentes, classes de cor ou lados da bipartição
+PALETA_DESENHO = ['#4e79a7', '#f28e2b', '#e15759', '#76b7b2', '#59a14f',
+                  '#edc948', '#b07aa1', '#ff9da7', '#9c755f', '#bab0ac']
+COR_PADRAO_DESENHO = '#97c2fc'
+
+# Agrupa um grafo grande em no máximo `limite` grupos para o desenho. Os vértices de maior grau
+# viram centros e cada vértice vai para o centro mais próximo (BFS de várias origens, vetorizada);
+# componentes sem nenhum centro viram um grupo cada. Ficam os `limite` maiores grupos.
+# Devolve (grupo de cada vértice ou -1 se omitido, representante de cada grupo, tamanhos,
+# arestas entre grupos como vetores origem/destino/quantidade).
+@instrumentar('desenho.agrupamento')
+def agrupar_para_desenho(grafo, limite=LIMITE_VERTICES_DESENHO):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    contar_visitas(n, g.number_of_edges())
+    graus = np.diff(g.offsets)
+    centros = np.argsort(-g.graus(), kind='stable')[:limite]
+    dono = np.full(n, -1, dtype=np.int64)
+    dono[centros] = np.arange(len(centros), dtype=np.int64)
+    marcado = np.zeros(n, dtype=bool)
+    fronteira = centros
+    while len(fronteira):
+        quantidade = graus[fronteira]
+        total = int(quantidade.sum())
+        if not total:
+            break
+        base = np.repeat(g.offsets[fronteira] - np.cumsum(quantidade) + quantidade, quantidade)
+        alvo = g.vizinhos[base + np.arange(total, dtype=np.int64)]
+        origem = np.repeat(dono[fronteira], quantidade)
+        livre = dono[alvo] == -1
+        dono[alvo[livre]] = origem[livre]
+        marcado[alvo[livre]] = True
+        fronteira = np.flatnonzero(marcado)
+        marcado[fronteira] = False
+
+    # Componentes que não receberam nenhum centro formam um grupo cada
+    sem_dono = dono == -1
+    if np.any(sem_dono):
+        _, inverso = np.unique(rotular_componentes(g).componente[sem_dono], return_inverse=True)
+        dono[sem_dono] = len(centros) + inverso
+
+    tamanhos = np.bincount(dono)
+    mantidos = np.argsort(-tamanhos, kind='stable')[:limite]
+    novo = np.full(len(tamanhos), -1, dtype=np.int64)
+    novo[mantidos] = np.arange(len(mantidos), dtype=np.int64)
+    grupo = novo[dono]
+    # O representante de um grupo é o seu vértice de maior grau
+    ordem = np.argsort(-g.graus(), kind='stable')
+    ordem = ordem[grupo[ordem] >= 0]
+    _, primeiro = np.unique(grupo[ordem], return_index=True)
+    representante = ordem[primeiro]
+
+    origens, destinos, _ = _vetores_de_arestas(g)
+    gu, gv = grupo[origens], grupo[destinos]
+    valida = (gu >= 0) & (gv >= 0) & (gu != gv)
+    m = max(len(mantidos), 1)
+    chave = np.minimum(gu, gv)[valida] * m + np.maximum(gu, gv)[valida]
+    chave, quantidade = np.unique(chave, return_counts=True)
+    return grupo, representante, tamanhos[mantidos], (chave // m, chave % m, quantidade)
+
+# Posições 2D pelo método de Fruchterman-Reingold, calculadas com NumPy: a repulsão entre todos
+# os pares é feita em float32, em blocos de linhas (memória O(bloco x n)), e a atração percorre o vetor de
+# arestas. Um pouco de gravidade mantém componentes desconexas perto do centro.
+# Devolve um vetor n x 2 com coordenadas em pixels.
+@instrumentar('desenho.layout')
+def calcular_layout(n, origens, destinos, iteracoes=50, semente=0, escala=1000.0):
+    gerador = np.random.default_rng(semente)
+    posicao = (gerador.random((n, 2)) - 0.5).astype(np.float32)
+    if n <= 1:
+        return posicao * 0
+    k = np.float32(1.0 / np.sqrt(n))
+    temperatura = 0.1
+    bloco = max(1, (1 << 22) // n)
+    for _ in range(iteracoes):
+        deslocamento = np.zeros((n, 2), dtype=np.float32)
+        x, y = posicao[:, 0], posicao[:, 1]
+        for inicio in range(0, n, bloco):
+            dx = x[inicio:inicio + bloco, None] - x[None, :]
+            dy = y[inicio:inicio + bloco, None] - y[None, :]
+            forca = dx * dx
+            forca += dy * dy
+            np.maximum(forca, 1e-9, out=forca)
+            np.divide(k * k, forca, out=forca)
+            deslocamento[inicio:inicio + bloco, 0] += (dx * forca).sum(axis=1)
+            deslocamento[inicio:inicio + bloco, 1] += (dy * forca).sum(axis=1)
+        delta = posicao[origens] - posicao[destinos]
+        forca = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        np.subtract.at(deslocamento, origens, forca)
+        np.add.at(deslocamento, destinos, forca)
+        deslocamento -= posicao * (k * 0.5)
+        tamanho = np.maximum(np.sqrt((deslocamento ** 2).sum(axis=1)), 1e-9)
+        posicao += deslocamento * (np.minimum(tamanho, temperatura) / tamanho)[:, None]
+        temperatura -= 0.1 / (iteracoes + 1)
+    posicao -= posicao.mean(axis=0)
+    return posicao * (escala / max(np.abs(posicao).max(), 1e-9))
+
+# Cor de destaque de cada vértice: 'componentes' (uma cor por componente), 'coloracao'
+# (coloração própria de calcular_coloracao_exata) ou 'biparticao' (os dois lados de cada
+# componente bipartida; componentes que não são bipartidas ficam com a cor padrão).
+def cores_de_destaque(grafo, destaque):
+    g = para_compacto(grafo)
+    if destaque == 'componentes':
+        classes = rotular_componentes(g).componente
+    elif destaque == 'coloracao':
+        classes = np.array(calcular_coloracao_exata(g)['coloracao'], dtype=np.int64)
+    elif destaque == 'biparticao':
+        componentes = rotular_componentes(g)
+        classes = componentes.cor.astype(np.int64)
+        bipartida = np.array([componentes.bipartida(c) for c in range(componentes.quantidade)])
+        classes[~bipartida[componentes.componente]] = -1
+    else:
+        raise ValueError(f"Destaque desconhecido: {destaque}")
+    return [COR_PADRAO_DESENHO if c < 0 else PALETA_DESENHO[c % len(PALETA_DESENHO)]
+            for c in classes.tolist()]
+
+# Desenha o grafo em um HTML do pyvis com tamanho limitado. Acima de `limite` vértices o grafo é
+# agrupado (agrupar_para_desenho) e cada grupo vira um nó proporcional ao seu tamanho; acima de
+# LIMITE_ARESTAS_DESENHO arestas só uma amostra fixa delas é desenhada. As posições são
+# calculadas aqui e a física do navegador fica desligada, então a página abre já estável.
+# Os nós e arestas vão direto para as listas do pyvis, só com os campos necessários
+# (add_node/add_edge procuram repetições em listas e ficam quadráticos).
+# Devolve um resumo com a quantidade de nós e arestas desenhados.
+@instrumentar('desenho')
+def desenhar_grafo(grafo, arquivo='G_pontes.html', destaque=None, limite=LIMITE_VERTICES_DESENHO):
+    g = para_compacto(grafo)
+    n = g.number_of_nodes()
+    cores = cores_de_destaque(g, destaque) if destaque else None
+    titulo = ''
+    if n > limite:
+        grupo, representante, tamanhos, (origens, destinos, pesos) = agrupar_para_desenho(g, limite)
+        rotulos = [str(g.rotulos[v]) for v in representante.tolist()]
+        dicas = [f"{g.rotulos[v]} e mais {t - 1} vértice(s)" for v, t in zip(representante.tolist(), tamanhos.tolist())]
+        tamanhos_no = (10 + 4 * np.log2(tamanhos)).tolist()
+        if cores is not None:
+            cores = [cores[v] for v in representante.tolist()]
+        omitidos = int(np.count_nonzero(grupo < 0))
+        titulo = f"{n} vértices agrupados em {len(representante)} grupos"
+        if omitidos:
+            titulo += f" ({omitidos} vértices de componentes pequenas omitidos)"
+        quantidade_nos = len(representante)
+    else:
+        origens, destinos, pesos = _vetores_de_arestas(g)
+        rotulos = [str(r) for r in g.rotulos]
+        dicas = None
+        tamanhos_no = None
+        quantidade_nos = n
+
+    if len(origens) > LIMITE_ARESTAS_DESENHO:
+        amostra = np.sort(np.random.default_rng(0).choice(len(origens), LIMITE_ARESTAS_DESENHO, replace=False))
+        titulo = (titulo + "; " if titulo else "") + \
+            f"{LIMITE_ARESTAS_DESENHO} de {len(origens)} arestas desenhadas"
+        origens, destinos, pesos = origens[amostra], destinos[amostra], pesos[amostra]
+
+    posicao = np.rint(calcular_layout(quantidade_nos, origens, destinos)).astype(np.int64).tolist()
+    nt = Network('1080px', '920px', directed=False, heading=titulo)
+    nt.toggle_physics(False)
+    for i in range(quantidade_nos):
+        no = {'id': i, 'label': rotulos[i], 'shape': 'dot', 'x': posicao[i][0], 'y': posicao[i][1],
+              'color': cores[i] if cores is not None else COR_PADRAO_DESENHO}
+        if tamanhos_no is not None:
+            no['size'] = round(tamanhos_no[i], 1)
+            no['title'] = dicas[i]
+        nt.nodes.append(no)
+        nt.node_ids.append(i)
+        nt.node_map[i] = no
+    # A dica da aresta é o peso; no grafo agrupado, quantas arestas ligam os dois grupos
+    sufixo = " aresta(s)" if n > limite else ""
+    for u, v, peso in zip(origens.tolist(), destinos.tolist(), pesos.tolist()):
+        nt.edges.append({'from': u, 'to': v, 'title': f"{peso}{sufixo}"})
+    with medir_etapa('desenho.html'):
+        nt.write_html(arquivo)
+    contar_visitas(quantidade_nos, len(nt.edges))
+    return {'nos': quantidade_nos, 'arestas': len(nt.edges), 'agrupado': n > limite}
 
 #função para visualizar diferentes propriedades de um grafo
 def visualizar_propriedades(grafo):
     
     # Verifica se o grafo é válido (não nulo e contém nós)
-    if grafo is None or not grafo.nodes:
+    if grafo is None or grafo.number_of_nodes() == 0:
         print("Não há um grafo aberto ou criado. Por favor, crie um grafo ou abra um existente.")
         return criar_grafo()
+
+    # O grafo editado no menu já mantém as propriedades baratas; os demais são convertidos
+    # uma única vez para que todas as opções compartilhem graus e componentes já calculados
+    incremental = grafo if isinstance(grafo, GrafoIncremental) else None
+    if incremental is None:
+        grafo = para_compacto(grafo)
     
     # Loop principal para exibir opções de propriedades do grafo
     while True:
@@ -281,7 +2926,11 @@ def visualizar_propriedades(grafo):
         print("8.  Grafo Hamiltoniano")
         print("9.  Grafo Árvore")
         print("10. Grafo planar")
-        print("11. Voltar")
+        print("11. Analisar todas as propriedades")
+        print("12. Caminho mínimo e árvore geradora mínima (pesos)")
+        print("13. Pontes, pontos de articulação e blocos")
+        print("14. Tarefas em segundo plano")
+        print("15. Voltar")
 
         # Solicita ao usuário que escolha uma opção
         opcao = input("Escolha uma opção para visualizar a propriedade do grafo: ")
@@ -291,74 +2940,168 @@ def visualizar_propriedades(grafo):
             # Função para verificar o grau do vértice
             if grafo.number_of_nodes() == 0:
                 print("O grafo está vazio.")
+            elif incremental is not None:
+                print(f"O grau máximo do meu grafo é: {incremental.grau_maximo()}")
+                print(f"O grau mínimo do meu grafo é: {incremental.grau_minimo()}")
             else:
-                grau_Max = max(dict(grafo.degree()).values())
-                grau_Min = min(dict(grafo.degree()).values())
+                graus = para_compacto(grafo).graus()
+                grau_Max = int(graus.max())
+                grau_Min = int(graus.min())
                 print(f"O grau máximo do meu grafo é: {grau_Max}")
                 print(f"O grau mínimo do meu grafo é: {grau_Min}")
         
         elif opcao == '2':
-            # Calcula e exibe o número cromático do grafo
-            numero_cromatico = calcular_numero_cromatico(grafo)
-            print(f"Número cromático do grafo: {numero_cromatico}")
+            # Calcula e exibe o número cromático do grafo (ou os limites, se o prazo acabar);
+            # uma busca demorada continua em segundo plano sem prender o menu
+            executar_no_menu('cromatico', grafo)
         
         elif opcao == '3':
             # Verifica e exibe se o grafo contém ciclos
-            if verifica_ciclo(grafo):
+            if incremental is not None:
+                aciclicidade = {'ciclico': incremental.ciclico(), 'componentes': incremental.componentes()}
+            else:
+                aciclicidade = classificar_aciclicidade(grafo)
+            if aciclicidade['ciclico']:
                 print("O grafo contém ciclos")
             else:
-                print("O grafo não contém ciclos")
+                print(f"O grafo não contém ciclos (floresta com {aciclicidade['componentes']} componente(s))")
         
         elif opcao == '4':
             # Verifica e exibe se o grafo é conexo
-            if verifica_conexo(grafo):
+            if incremental is not None:
+                if incremental.conexo():
+                    print("O grafo é conexo")
+                else:
+                    print("O grafo não é conexo")
+                    print(f"Componentes: {incremental.componentes()}")
+                continue
+            componentes = rotular_componentes(grafo)
+            if componentes.quantidade == 1:
                 print("O grafo é conexo")
             else:
                 print("O grafo não é conexo")
+                print(f"Componentes: {componentes.quantidade} (maior com {max(componentes.tamanhos)} vértices)")
         
         elif opcao == '5':
             # Verifica e exibe se o grafo é bipartido
-            if is_bipartite(grafo):
+            if incremental is not None and incremental.bipartido():
+                print("O grafo é bipartido.")
+                continue
+            # O ciclo ímpar usado como prova vem da rotulação completa
+            componentes = rotular_componentes(grafo)
+            if componentes.todas_bipartidas():
                 print("O grafo é bipartido.")
             else:
                 print("O grafo não é bipartido.")
+                # Mostra um ciclo ímpar da primeira componente que não é bipartida
+                c = next(c for c in range(componentes.quantidade) if not componentes.bipartida(c))
+                ciclo = [para_compacto(grafo).rotulos[v] for v in componentes.ciclo_impar(c)]
+                print(f"Ciclo ímpar encontrado: {' - '.join(map(str, ciclo))}")
                 
         elif opcao == '6':
-            # Verifica e exibe se o grafo é completo
+            # Verifica e exibe se o grafo é completo (contagem de arestas, sem testar todos os pares)
             if is_completo(grafo):
                 print("O grafo é completo.")
             else:
                 print("O grafo não é completo.")
+                u, v = primeiro_par_faltante(grafo)
+                print(f"Faltam {arestas_complemento(grafo)} aresta(s); por exemplo, {u}-{v}.")
+            if is_regular(grafo):
+                k = incremental.grau_maximo() if incremental is not None else int(para_compacto(grafo).graus()[0])
+                print(f"O grafo é {k}-regular.")
         
         elif opcao == '7':
-            # Verifica e exibe se o grafo é euleriano
-            if is_eulerian(grafo):
-                print("O grafo é Euleriano.")
+            # Verifica se o grafo é euleriano e exibe o circuito (ou caminho) encontrado
+            if incremental is not None:
+                tipo = incremental.tipo_euleriano()
+            else:
+                tipo = classificar_euleriano(grafo)
+            if tipo is None:
+                print("O grafo não é Euleriano (não tem circuito nem caminho euleriano).")
             else:
-                print("O grafo não é Euleriano.")
+                if tipo == 'circuito':
+                    print("O grafo é Euleriano.")
+                else:
+                    print("O grafo não é Euleriano, mas tem caminho euleriano.")
+                # Guarda só o começo do percurso para exibir; o restante é apenas contado
+                vertices = []
+                total = 0
+                for origem, destino, _ in percorrer_euleriano(grafo):
+                    if not total:
+                        vertices.append(origem)
+                    if len(vertices) <= LIMITE_PERCURSO_EXIBIDO:
+                        vertices.append(destino)
+                    total += 1
+                rotulo = "Circuito" if tipo == 'circuito' else "Caminho"
+                if len(vertices) > LIMITE_PERCURSO_EXIBIDO:
+                    print(f"{rotulo} ({total} arestas, início): "
+                          f"{' - '.join(map(str, vertices[:LIMITE_PERCURSO_EXIBIDO]))} - ...")
+                elif total:
+                    print(f"{rotulo}: {' - '.join(map(str, vertices))}")
         
         elif opcao == '8':
-            # Verifica e exibe se o grafo é hamiltoniano
-            if is_hamiltonian(grafo):
-                print("O grafo é Hamiltoniano.")
-            else:
-                print("O grafo não é Hamiltoniano.")
+            # Verifica e exibe se o grafo é hamiltoniano, com o ciclo encontrado ou o motivo
+            executar_no_menu('hamiltoniano', grafo)
 
         elif opcao == '9':
             # Verifica e exibe se o grafo é uma árvore
-            if is_tree(grafo):
+            if incremental is not None:
+                aciclicidade = {'arvore': incremental.arvore(), 'floresta': not incremental.ciclico()}
+            else:
+                aciclicidade = classificar_aciclicidade(grafo)
+            if aciclicidade['arvore']:
                 print("O grafo é uma árvore")
+            elif aciclicidade['floresta']:
+                print("O Grafo não é uma árvore (é uma floresta, mas não é conexo)")
             else:
                 print("O Grafo não é uma árvore")
         
         elif opcao == '10':
-            # Verifica e exibe se o grafo é planar
-            if check_planarity(grafo)[0]:
-                print("O grafo é planar.")
-            else:
-                print("O grafo não é planar.")
+            # Verifica e exibe se o grafo é planar; se não for, mostra o subgrafo de Kuratowski
+            # (procurado só até LIMITE_CERTIFICADO_MENU arestas; o embedding planar não é exibido)
+            certificado = para_compacto(grafo).number_of_edges() <= LIMITE_CERTIFICADO_MENU
+            executar_no_menu('planaridade', grafo, certificado=certificado, embedding=False)
 
         elif opcao == '11':
+            # Calcula todas as propriedades de uma vez, reaproveitando graus e componentes
+            executar_no_menu('tudo', grafo)
+
+        elif opcao == '12':
+            # Usa os pesos lidos do arquivo: caminho mínimo entre dois vértices e árvore geradora mínima
+            compacto = para_compacto(grafo)
+            origem = input("Digite o vértice de origem (ou deixe em branco para só a árvore geradora mínima): ")
+            if origem:
+                destino = input("Digite o vértice de destino: ")
+                if origem not in compacto.indice or destino not in compacto.indice:
+                    print("Vértice não encontrado no grafo.")
+                    continue
+                try:
+                    caminho = caminho_minimo(compacto, origem, destino)
+                except ValueError as e:
+                    print(e)
+                    continue
+                if caminho['caminho'] is None:
+                    print(f"Não há caminho entre {origem} e {destino}.")
+                else:
+                    print(f"Distância mínima: {caminho['distancia']}")
+                    print(f"Caminho: {' - '.join(map(str, caminho['caminho']))}")
+            agm = arvore_geradora_minima(compacto)
+            if agm['componentes'] > 1:
+                print(f"Floresta geradora mínima ({agm['componentes']} componentes): peso {agm['peso']}")
+            else:
+                print(f"Árvore geradora mínima: peso {agm['peso']}")
+            if len(agm['arestas']) <= LIMITE_PERCURSO_EXIBIDO:
+                print(', '.join(f"{u}-{v} ({peso})" for u, v, peso in agm['arestas']))
+
+        elif opcao == '13':
+            # Índice estrutural (o mesmo que acelera hamiltoniano, planaridade e coloração)
+            executar_no_menu('estrutura', grafo)
+
+        elif opcao == '14':
+            # Acompanha, exibe ou cancela as análises que continuaram em segundo plano
+            gerenciar_tarefas()
+
+        elif opcao == '15':
             # Sai do loop e retorna ao menu principal
             break
         else:
@@ -371,46 +3114,46 @@ def abrir_arquivo_existente():
         arquivo = input("Digite o nome do arquivo existente: ")
         # Verifica se o arquivo existe
         if os.path.exists(arquivo):
+            # Arquivos de arestas grandes demais para a memória podem ser analisados em fluxo
+            if arquivo.endswith(('.csv', '.txt')) and carga_excede_memoria(arquivo):
+                resposta = input("O arquivo provavelmente não cabe na memória. Analisar em fluxo, "
+                                 "sem carregar o grafo? (s/n): ")
+                if resposta.strip().lower() == 's':
+                    try:
+                        exibir_analise_em_fluxo(analisar_em_fluxo(arquivo))
+                    except Exception as e:
+                        print(f"Erro ao analisar o arquivo: {e}")
+                    return None
             if arquivo.endswith('.csv'):
-                grafo = nx.Graph()
                 try:
-                    # Abre o arquivo CSV e lê as arestas
-                    with open(arquivo, 'r', newline='') as file:
-                        # Cria um objeto leitor CSV associado ao arquivo aberto
-                        reader = csv.reader(file)
-                        # Itera sobre cada linha no arquivo
-                        for row in reader:
-                            # Verifica se a linha tem pelo menos dois elementos, representando uma aresta no grafo
-                            if len(row) >= 2:
-                                # Atribui os dois primeiros elementos da linha às variáveis origem e destino
-                                origem, destino = row[0], row[1]
-                                # Obtém o terceiro elemento da linha como o peso da aresta, convertendo-o para um inteiro
-                                # Assume peso 1 se o terceiro elemento não existir (aresta sem peso especificado)
-                                peso = int(row[2]) if len(row) > 2 else 1  
-                                # Adiciona a aresta ao grafo, especificando origem, destino e peso
-                                grafo.add_edge(origem, destino, weight=peso)
+                    # Lê o arquivo CSV em blocos e monta o grafo compacto em lote
+                    grafo, estatisticas = carregar_arestas(arquivo)
                     print("Arquivo aberto e grafo carregado.")
+                    exibir_estatisticas_carga(estatisticas)
                     return grafo
                 except Exception as e:
                     print(f"Erro ao abrir o arquivo CSV: {e}")
             # Se o arquivo for do tipo TXT      
             elif arquivo.endswith('.txt'):
-                grafo = nx.Graph()
                 try:
-                    # Abre o arquivo de texto e lê as arestas
-                    with open(arquivo, 'r') as file:
-                        lines = file.readlines()
-                        for line in lines:
-                            parts = line.strip().split()
-                            if len(parts) >= 2:
-                                origem, destino = parts[0], parts[1]
-                                peso = int(parts[2]) if len(parts) > 2 else 1  # Assume peso 1 se não especificado
-                                grafo.add_edge(origem, destino, weight=peso)
+                    # Lê o arquivo de texto em blocos, sem carregar todas as linhas na memória
+                    grafo, estatisticas = carregar_arestas(arquivo)
                     print("Arquivo aberto e grafo carregado.")
+                    exibir_estatisticas_carga(estatisticas)
                     return grafo
                 except Exception as e:
                     print(f"Erro ao abrir o arquivo de texto: {e}")
 
+            # Se o arquivo for um snapshot binário
+            elif arquivo.endswith('.grafo'):
+                try:
+                    # Mapeia os vetores do snapshot na memória, sem interpretar texto
+                    grafo = abrir_snapshot(arquivo)
+                    print("Arquivo aberto e grafo carregado.")
+                    return grafo
+                except Exception as e:
+                    print(f"Erro ao abrir o snapshot: {e}")
+
             else:
                 print("Formato de arquivo não suportado.")
         else:
@@ -422,7 +3165,8 @@ def salvar_grafo(grafo):
         print("\nOpções para salvar o grafo:")
         print("1. Salvar em CSV")
         print("2. Salvar em TXT")
-        print("3. Voltar")
+        print("3. Salvar em snapshot binário (.grafo)")
+        print("4. Voltar")
 
         #Solicita a escolha da opção ao usuário
         opcao = input("Escolha uma opção para salvar o grafo: ")
@@ -435,7 +3179,7 @@ def salvar_grafo(grafo):
                 # Lógica para salvar o grafo em um arquivo CSV
                 with open(arquivo_csv, 'w', newline='') as file:
                     writer = csv.writer(file)
-                    for origem, destino, peso in grafo.edges(data='weight', default=1):
+                    for origem, destino, peso in arestas_com_peso(grafo):
                         writer.writerow([origem, destino, peso])
                 print(f"Grafo salvo no arquivo CSV: {arquivo_csv}")
             else:
@@ -449,7 +3193,7 @@ def salvar_grafo(grafo):
                 # Lógica para salvar o grafo em um arquivo de texto
                 with open(arquivo_txt, 'w') as file:
                     # Itera sobre as arestas do grafo, obtendo origem, destino e peso (ou assumindo peso 1 se não especificado)
-                    for origem, destino, peso in grafo.edges(data='weight', default=1):
+                    for origem, destino, peso in arestas_com_peso(grafo):
                         # Escreve a representação da aresta no arquivo TXT, seguida por uma quebra de linha
                         file.write(f"{origem} {destino} {peso}\n")
                 # Exibe mensagem indicando que o grafo foi salvo no arquivo TXT com o nome fornecido
@@ -458,6 +3202,17 @@ def salvar_grafo(grafo):
                 print("Formato de arquivo não é TXT.")
         
         elif opcao == "3":
+            # Solicita o nome do arquivo de snapshot para salvar o grafo
+            arquivo_grafo = input("Digite o nome do arquivo .grafo para salvar: ")
+            # Verifica se o nome do arquivo tem a extensão correta
+            if arquivo_grafo.endswith('.grafo'):
+                # Grava rótulos e vetores CSR em formato binário, prontos para serem mapeados na reabertura
+                salvar_snapshot(grafo, arquivo_grafo)
+                print(f"Grafo salvo no arquivo de snapshot: {arquivo_grafo}")
+            else:
+                print("Formato de arquivo não é .grafo.")
+
+        elif opcao == "4":
             return criar_grafo()
         else:
             print("Opção inválida. Tente novamente.")
@@ -483,6 +3238,9 @@ def criar_grafo():
         escolha = input("Escolha uma opção: ")
 
         if escolha == "1":
+            # A edição é feita em um GrafoIncremental, que atualiza as propriedades a cada aresta
+            if not isinstance(grafo, GrafoIncremental):
+                grafo = GrafoIncremental(grafo)
             while True:
                 # Solicita a entrada do usuário para vértices de origem e destino, permitindo a adição de arestas
                 origem = input("Digite o vértice de origem (ou 'fim' para encerrar): ")
@@ -504,10 +3262,13 @@ def criar_grafo():
                 print(f"Aresta adicionada: {origem} -> {destino}")
 
         elif escolha == "2":
-            # Visualiza o grafo criado e o salva em um arquivo HTML
-            nt = Network('1080px', '920px', directed=False)
-            nt.from_nx(grafo)
-            nt.write_html('G_pontes.html')
+            # Visualiza o grafo criado e o salva em um arquivo HTML, opcionalmente destacando
+            # uma propriedade; grafos grandes são agrupados para o arquivo continuar leve
+            destaques = {'1': None, '2': 'componentes', '3': 'coloracao', '4': 'biparticao'}
+            opcao = input("Destacar (1. Nada, 2. Componentes, 3. Coloração, 4. Bipartição): ")
+            resumo = desenhar_grafo(grafo, 'G_pontes.html', destaques.get(opcao))
+            if resumo['agrupado']:
+                print(f"Grafo grande: desenhado com {resumo['nos']} grupos e {resumo['arestas']} arestas.")
             print("Grafo visualizado em 'G_pontes.html'")
 
         elif escolha == "3":
@@ -535,6 +3296,514 @@ def criar_grafo():
             print("Opção inválida. Tente novamente.")
 
 
+# Carrega um grafo de arquivo pela extensão: .csv/.txt (carregador em blocos) ou .grafo (snapshot)
+def carregar_grafo(arquivo):
+    if arquivo.endswith('.csv') or arquivo.endswith('.txt'):
+        return carregar_arestas(arquivo)[0]
+    if arquivo.endswith('.grafo'):
+        return abrir_snapshot(arquivo)
+    raise ValueError("Formato de arquivo não suportado.")
+
+# Tratador do SIGALRM usado para limitar o tempo de análise de cada arquivo no lote
+def _tempo_esgotado(signum, frame):
+    raise TimeoutError("tempo limite do arquivo esgotado")
+
+# Fração do tempo que sobra depois da carga dada às buscas exatas de cada arquivo no lote; o resto
+# cobre planaridade, impressão digital e a análise de pesos, que não têm prazo próprio
+FRACAO_BUSCAS_LOTE = 0.5
+
+# Analisa um arquivo dentro de um processo do lote e devolve uma linha de resultado.
+# O limite por arquivo é garantido por um alarme (SIGALRM); as buscas exatas recebem uma fração
+# do tempo que de fato sobrou depois da carga, para terminarem com limites em vez de serem
+# interrompidas. Se o alarme vencer mesmo assim, a linha sai com o resultado parcial, 'ok' falso
+# e 'etapa_esgotada' (carga, analise ou pesos).
+# Com fluxo=True os arquivos de arestas são analisados em fluxo, sem carregar o grafo.
+def _analisar_arquivo_lote(arquivo, tempo_limite_arquivo, pesos=False, fluxo=False):
+    inicio = time.perf_counter()
+    linha = {'arquivo': arquivo, 'ok': False}
+    instrumentacao.limpar()
+    if tempo_limite_arquivo:
+        signal.signal(signal.SIGALRM, _tempo_esgotado)
+        signal.setitimer(signal.ITIMER_REAL, tempo_limite_arquivo)
+    etapa = 'carga'
+    try:
+        if fluxo and not arquivo.endswith('.grafo'):
+            linha['resultado'] = analisar_em_fluxo(arquivo)
+            linha['ok'] = True
+            return linha
+        grafo = carregar_grafo(arquivo)
+        etapa = 'analise'
+        tempo_busca = TEMPO_LIMITE_CROMATICO
+        if tempo_limite_arquivo:
+            restante = inicio + tempo_limite_arquivo - time.perf_counter()
+            tempo_busca = min(tempo_busca, max(0.0, restante) * FRACAO_BUSCAS_LOTE)
+        linha['resultado'] = analisar_tudo(grafo, tempo_busca)
+        if 'tempo_esgotado' in linha['resultado']:
+            raise TimeoutError("tempo limite do arquivo esgotado")
+        if pesos:
+            etapa = 'pesos'
+            linha['pesos'] = analisar_pesos(grafo)
+        linha['ok'] = True
+    except Exception as e:
+        linha['erro'] = f"{type(e).__name__}: {e}"
+        if isinstance(e, TimeoutError):
+            linha['etapa_esgotada'] = etapa
+            if etapa == 'analise' and 'resultado' not in linha:
+                # O alarme venceu antes de analisar_tudo começar (na impressão digital do cache)
+                g = para_compacto(grafo)
+                linha['resultado'] = {'vertices': g.number_of_nodes(), 'arestas': g.number_of_edges(),
+                                      'lacos': g.lacos(), **dict.fromkeys(PROPRIEDADES_CARAS),
+                                      'tempo_esgotado': list(PROPRIEDADES_CARAS)}
+    finally:
+        if tempo_limite_arquivo:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        linha['segundos'] = round(time.perf_counter() - inicio, 6)
+        if instrumentacao.ativa:
+            linha['instrumentacao'] = instrumentacao.resumo()
+    return linha
+
+# Prepara cada processo do lote: cache próprio (diretório em disco compartilhado) e instrumentação
+def _iniciar_processo_lote(capacidade, diretorio_cache, modos_instrumentacao):
+    configurar_cache(capacidade, diretorio_cache)
+    configurar_instrumentacao(modos_instrumentacao)
+
+# Analisa vários arquivos em paralelo (ProcessPoolExecutor) e escreve uma linha JSON por arquivo,
+# na ordem em que terminam. Com a instrumentação ligada, cada linha traz o resumo por etapa do
+# arquivo e o total agregado de todos os arquivos sai na saída de erro. Devolve o número de
+# arquivos que falharam.
+def analisar_em_lote(arquivos, processos=None, tempo_limite_arquivo=None, saida=None,
+                     diretorio_cache=None, pesos=False, fluxo=False):
+    saida = saida or sys.stdout
+    falhas = 0
+    resumos = []
+    # Cada processo do lote tem seu próprio LRU; o diretório em disco é compartilhado entre eles
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo_lote,
+                             initargs=(128, diretorio_cache, instrumentacao.modos)) as executor:
+        tarefas = {executor.submit(_analisar_arquivo_lote, arquivo, tempo_limite_arquivo, pesos, fluxo): arquivo
+                   for arquivo in arquivos}
+        for tarefa in as_completed(tarefas):
+            try:
+                linha = tarefa.result()
+            except Exception as e:
+                # O processo do lote morreu (falta de memória, por exemplo)
+                linha = {'arquivo': tarefas[tarefa], 'ok': False, 'erro': f"{type(e).__name__}: {e}"}
+            falhas += not linha['ok']
+            if 'instrumentacao' in linha:
+                resumos.append(linha['instrumentacao'])
+            saida.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            saida.flush()
+    if resumos:
+        print(f"\nInstrumentação agregada de {len(resumos)} arquivo(s):", file=sys.stderr)
+        exibir_instrumentacao(agregar_instrumentacao(resumos))
+    return falhas
+
+# Análises que podem ser pedidas como tarefa (pelo menu ou pelo serviço JSON)
+ANALISES = {
+    'tudo': analisar_tudo,
+    'cromatico': calcular_coloracao_exata,
+    'hamiltoniano': buscar_ciclo_hamiltoniano,
+    'planaridade': verificar_planaridade,
+    'euleriano': classificar_euleriano,
+    'pesos': analisar_pesos,
+    'estrutura': analisar_estrutura,
+}
+# Quantas threads de trabalho o servidor de tarefas usa por padrão
+TRABALHADORES_PADRAO = 2
+# Folga (em segundos) depois do tempo limite antes de pedir o cancelamento: as buscas exatas
+# param sozinhas no prazo e devolvem seus limites, o cancelamento é só para o que não para
+FOLGA_TEMPO_LIMITE = 1.0
+
+# Uma análise submetida ao servidor de tarefas. O estado passa por 'pendente', 'executando' e
+# termina em 'concluida', 'cancelada', 'expirada' (tempo limite da tarefa) ou 'erro'. O progresso é
+# um dicionário atualizado pela própria busca (informar_progresso): nós expandidos, melhor limite...
+class Tarefa:
+    def __init__(self, identificador, analise, funcao, grafo, tempo_limite, argumentos):
+        self.id = identificador
+        self.analise = analise
+        self.funcao = funcao
+        self.grafo = grafo
+        self.tempo_limite = tempo_limite
+        self.argumentos = argumentos
+        self.estado = 'pendente'
+        self.progresso = {}
+        self.resultado = None
+        self.erro = None
+        self.cancelar = threading.Event()
+        self.expirou = False
+        self.criada = time.time()
+        self.inicio = None
+        self.fim = None
+        self.terminada = threading.Event()
+        self._futuro = None
+
+    @property
+    def ativa(self):
+        return not self.terminada.is_set()
+
+    def executar(self):
+        if self.cancelar.is_set():
+            self._terminar('cancelada')
+            return
+        self.estado = 'executando'
+        self.inicio = time.time()
+        _contexto_tarefa.tarefa = self
+        try:
+            self.resultado = self.funcao(self.grafo, **self.argumentos)
+            estado = 'concluida'
+        except Exception as e:
+            self.erro = f"{type(e).__name__}: {e}"
+            estado = 'erro'
+        finally:
+            _contexto_tarefa.tarefa = None
+        if self.cancelar.is_set() and estado == 'concluida':
+            estado = 'expirada' if self.expirou else 'cancelada'
+        self._terminar(estado)
+
+    def _terminar(self, estado):
+        self.estado = estado
+        self.fim = time.time()
+        # O grafo não é mais necessário depois que a tarefa termina
+        self.grafo = None
+        self.terminada.set()
+
+    # Pede o cancelamento: uma tarefa pendente nem começa; uma em execução para no próximo ponto
+    # de verificação da busca (as buscas exatas conferem o cancelamento a cada passo)
+    def cancelar_tarefa(self, expirou=False):
+        if not self.ativa:
+            return False
+        self.expirou = self.expirou or expirou
+        self.cancelar.set()
+        if self._futuro is not None and self._futuro.cancel():
+            self._terminar('expirada' if expirou else 'cancelada')
+        return True
+
+    def esperar(self, tempo=None):
+        return self.terminada.wait(tempo)
+
+    # Estado da tarefa só com tipos simples, como devolvido pelo serviço JSON
+    def para_dicionario(self, com_resultado=True):
+        fim = self.fim or time.time()
+        dados = {'id': self.id, 'analise': self.analise, 'estado': self.estado,
+                 'progresso': dict(self.progresso),
+                 'segundos': round(fim - self.inicio, 6) if self.inicio else 0.0}
+        if self.erro:
+            dados['erro'] = self.erro
+        if com_resultado and not self.ativa and self.resultado is not None:
+            dados['resultado'] = self.resultado
+        return dados
+
+# Executa análises em um conjunto de threads. As buscas longas liberam o terminal porque rodam
+# fora da thread do menu (input() espera sem segurar o GIL); o tempo limite de cada tarefa é
+# repassado à análise e, além disso, um temporizador pede o cancelamento quando ele acaba.
+class ServidorTarefas:
+    def __init__(self, trabalhadores=TRABALHADORES_PADRAO):
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='tarefa')
+        self._tarefas = OrderedDict()
+        self._trava = threading.Lock()
+        self._proximo = 1
+
+    def enviar(self, analise, grafo, tempo_limite=None, **argumentos):
+        funcao = ANALISES[analise]
+        if tempo_limite is not None and 'tempo_limite' in inspect.signature(funcao).parameters:
+            argumentos['tempo_limite'] = tempo_limite
+        with self._trava:
+            tarefa = Tarefa(self._proximo, analise, funcao, para_compacto(grafo), tempo_limite, argumentos)
+            self._tarefas[tarefa.id] = tarefa
+            self._proximo += 1
+        tarefa._futuro = self._executor.submit(tarefa.executar)
+        if tempo_limite is not None:
+            temporizador = threading.Timer(tempo_limite + FOLGA_TEMPO_LIMITE, tarefa.cancelar_tarefa,
+                                           kwargs={'expirou': True})
+            temporizador.daemon = True
+            temporizador.start()
+        return tarefa
+
+    def obter(self, identificador):
+        with self._trava:
+            return self._tarefas.get(identificador)
+
+    def listar(self):
+        with self._trava:
+            return list(self._tarefas.values())
+
+    # Remove as tarefas já terminadas (e seus resultados) da lista
+    def limpar(self):
+        with self._trava:
+            for identificador in [t.id for t in self._tarefas.values() if not t.ativa]:
+                del self._tarefas[identificador]
+
+    def encerrar(self):
+        for tarefa in self.listar():
+            tarefa.cancelar_tarefa()
+        self._executor.shutdown(wait=True)
+
+_servidor_menu = None
+
+# Servidor de tarefas do menu interativo, criado na primeira análise longa
+def servidor_do_menu():
+    global _servidor_menu
+    if _servidor_menu is None:
+        _servidor_menu = ServidorTarefas()
+    return _servidor_menu
+
+# Quanto tempo (em segundos) o menu espera por uma análise antes de deixá-la em segundo plano
+ESPERA_MENU = 2.0
+# Acima desta quantidade de arestas o menu não procura o subgrafo de Kuratowski
+LIMITE_CERTIFICADO_MENU = 100000
+# Como o menu exibe o resultado de cada análise
+EXIBICAO_MENU = {
+    'tudo': exibir_analise,
+    'cromatico': exibir_cromatico,
+    'hamiltoniano': exibir_hamiltoniano,
+    'planaridade': exibir_planaridade,
+    'estrutura': exibir_estrutura,
+}
+
+# Exibe o resultado (ou o erro) de uma tarefa terminada
+def exibir_tarefa(tarefa):
+    if tarefa.estado == 'erro':
+        print(f"Tarefa {tarefa.id} ({tarefa.analise}) falhou: {tarefa.erro}")
+    elif tarefa.resultado is None:
+        print(f"Tarefa {tarefa.id} ({tarefa.analise}) {tarefa.estado} antes de produzir um resultado.")
+    else:
+        if tarefa.estado != 'concluida':
+            print(f"Tarefa {tarefa.id} ({tarefa.analise}) {tarefa.estado}; resultado parcial:")
+        EXIBICAO_MENU.get(tarefa.analise, print)(tarefa.resultado)
+
+# Roda uma análise do menu como tarefa: se terminar logo, o resultado aparece como antes;
+# senão ela continua em segundo plano e o menu volta a aceitar opções
+def executar_no_menu(analise, grafo, **argumentos):
+    tarefa = servidor_do_menu().enviar(analise, grafo, **argumentos)
+    if tarefa.esperar(ESPERA_MENU):
+        exibir_tarefa(tarefa)
+    else:
+        print(f"A análise continua em segundo plano (tarefa {tarefa.id}); "
+              f"acompanhe pela opção 'Tarefas em segundo plano'.")
+
+# Lista as tarefas do menu e permite ver o resultado de uma ou cancelá-la
+def gerenciar_tarefas():
+    servidor = servidor_do_menu()
+    while True:
+        tarefas = servidor.listar()
+        if not tarefas:
+            print("Nenhuma tarefa em segundo plano.")
+            return
+        for tarefa in tarefas:
+            progresso = ', '.join(f"{nome}: {valor}" for nome, valor in tarefa.progresso.items())
+            segundos = (tarefa.fim or time.time()) - (tarefa.inicio or time.time())
+            print(f"{tarefa.id}. {tarefa.analise} - {tarefa.estado} ({segundos:.1f} s)"
+                  + (f" [{progresso}]" if progresso and tarefa.ativa else ""))
+        escolha = input("Número da tarefa para ver o resultado, 'c N' para cancelar, "
+                        "'l' para limpar as terminadas ou Enter para voltar: ").strip()
+        if not escolha:
+            return
+        if escolha == 'l':
+            servidor.limpar()
+            continue
+        cancelar = escolha.startswith('c')
+        numero = escolha[1:].strip() if cancelar else escolha
+        tarefa = servidor.obter(int(numero)) if numero.isdigit() else None
+        if tarefa is None:
+            print("Tarefa não encontrada.")
+        elif cancelar:
+            if tarefa.cancelar_tarefa():
+                tarefa.esperar(ESPERA_MENU)
+                print(f"Tarefa {tarefa.id}: {tarefa.estado}")
+            else:
+                print("A tarefa já terminou.")
+        elif tarefa.ativa:
+            print(f"Tarefa {tarefa.id} ainda em execução.")
+        else:
+            exibir_tarefa(tarefa)
+
+# Monta um GrafoCompacto a partir de uma lista de arestas [origem, destino] ou
+# [origem, destino, peso] (e, opcionalmente, de uma lista de vértices isolados)
+def grafo_de_arestas(arestas, vertices=()):
+    indice = {}
+    for vertice in vertices:
+        indice.setdefault(str(vertice), len(indice))
+    origens, destinos, pesos = [], [], []
+    for aresta in arestas:
+        origens.append(indice.setdefault(str(aresta[0]), len(indice)))
+        destinos.append(indice.setdefault(str(aresta[1]), len(indice)))
+        pesos.append(aresta[2] if len(aresta) > 2 else 1)
+    return GrafoCompacto.de_arestas(list(indice), origens, destinos, pesos if pesos else None)
+
+# Atende um pedido do serviço JSON e devolve a resposta (também um dicionário). Ações:
+#   enviar   {'analise', 'arestas' [e 'vertices'] ou 'arquivo', 'tempo_limite'} -> estado da tarefa
+#   estado   {'id'}                      -> estado, progresso e resultado (se terminou)
+#   esperar  {'id', 'tempo'}             -> como estado, depois de esperar até 'tempo' segundos
+#   cancelar {'id'}                      -> estado depois do pedido de cancelamento
+#   listar                               -> estados de todas as tarefas (sem os resultados)
+#   limpar                               -> remove as tarefas terminadas
+def atender_pedido(servidor, pedido):
+    acao = pedido.get('acao')
+    if acao == 'enviar':
+        analise = pedido.get('analise', 'tudo')
+        if analise not in ANALISES:
+            return {'erro': f"análise desconhecida: {analise}", 'analises': list(ANALISES)}
+        if 'arquivo' in pedido:
+            grafo = carregar_grafo(pedido['arquivo'])
+        else:
+            grafo = grafo_de_arestas(pedido.get('arestas', []), pedido.get('vertices', ()))
+        tarefa = servidor.enviar(analise, grafo, pedido.get('tempo_limite'))
+        return tarefa.para_dicionario()
+    if acao == 'listar':
+        return {'tarefas': [tarefa.para_dicionario(com_resultado=False) for tarefa in servidor.listar()]}
+    if acao == 'limpar':
+        servidor.limpar()
+        return {'ok': True}
+    if acao in ('estado', 'esperar', 'cancelar'):
+        tarefa = servidor.obter(pedido.get('id'))
+        if tarefa is None:
+            return {'erro': f"tarefa inexistente: {pedido.get('id')}"}
+        if acao == 'esperar':
+            tarefa.esperar(pedido.get('tempo'))
+        elif acao == 'cancelar':
+            tarefa.cancelar_tarefa()
+            tarefa.esperar(1.0)
+        return tarefa.para_dicionario()
+    return {'erro': f"ação desconhecida: {acao}"}
+
+# Responde a um pedido tratando os erros como resposta, para o serviço nunca cair por um pedido ruim
+def _responder(servidor, pedido):
+    try:
+        if not isinstance(pedido, dict):
+            return {'erro': "o pedido deve ser um objeto JSON"}
+        return atender_pedido(servidor, pedido)
+    except Exception as e:
+        return {'erro': f"{type(e).__name__}: {e}"}
+
+# Serviço pela entrada padrão: um pedido JSON por linha, uma resposta JSON por linha
+def servir_stdin(servidor, entrada=None, saida=None):
+    entrada = entrada or sys.stdin
+    saida = saida or sys.stdout
+    for linha in entrada:
+        if not linha.strip():
+            continue
+        try:
+            pedido = json.loads(linha)
+        except json.JSONDecodeError as e:
+            resposta = {'erro': f"JSON inválido: {e}"}
+        else:
+            resposta = _responder(servidor, pedido)
+        saida.write(json.dumps(resposta, ensure_ascii=False) + "\n")
+        saida.flush()
+
+# Serviço HTTP local. POST em qualquer caminho recebe o mesmo pedido JSON da entrada padrão;
+# GET /tarefas lista as tarefas e GET /tarefas/<id> devolve o estado de uma delas.
+def servir_http(servidor, host='127.0.0.1', porta=8765):
+    class Tratador(BaseHTTPRequestHandler):
+        def _enviar(self, resposta, codigo=None):
+            corpo = json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+            self.send_response(codigo or (400 if 'erro' in resposta else 200))
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_POST(self):
+            tamanho = int(self.headers.get('Content-Length', 0))
+            try:
+                pedido = json.loads(self.rfile.read(tamanho) or b'{}')
+            except json.JSONDecodeError as e:
+                self._enviar({'erro': f"JSON inválido: {e}"})
+                return
+            self._enviar(_responder(servidor, pedido))
+
+        def do_GET(self):
+            partes = [parte for parte in self.path.split('?')[0].split('/') if parte]
+            if partes == ['tarefas']:
+                self._enviar(_responder(servidor, {'acao': 'listar'}))
+            elif len(partes) == 2 and partes[0] == 'tarefas' and partes[1].isdigit():
+                self._enviar(_responder(servidor, {'acao': 'estado', 'id': int(partes[1])}))
+            else:
+                self._enviar({'erro': f"caminho desconhecido: {self.path}"}, 404)
+
+        def log_message(self, formato, *args):
+            pass
+
+    http = ThreadingHTTPServer((host, porta), Tratador)
+    print(f"Servindo em http://{host}:{http.server_address[1]}", file=sys.stderr, flush=True)
+    try:
+        http.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http.server_close()
+
+# Ponto de entrada: sem argumentos abre o menu interativo; "analyze" roda o modo em lote
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Criação, visualização e análise de grafos.")
+    parser.add_argument('--instrumentar', default=None, metavar='MODOS',
+                        help="mede as etapas (tempo, memoria, perfil ou tudo, separados por vírgula); "
+                             "o mesmo que a variável GRAFO_INSTRUMENTAR")
+    subcomandos = parser.add_subparsers(dest='comando')
+    analisar = subcomandos.add_parser('analyze', aliases=['analisar'],
+                                      help="analisa arquivos de arestas sem interação")
+    analisar.add_argument('arquivos', nargs='+', help="arquivos .csv, .txt ou .grafo")
+    analisar.add_argument('--jobs', '-j', type=int, default=None,
+                          help="número de processos (padrão: número de CPUs)")
+    analisar.add_argument('--timeout', type=float, default=None,
+                          help="tempo limite em segundos por arquivo")
+    analisar.add_argument('--saida', '-o', default=None,
+                          help="arquivo JSON lines de saída (padrão: saída padrão)")
+    analisar.add_argument('--cache', default=os.environ.get('GRAFO_CACHE_DIR'),
+                          help="diretório do cache de resultados em disco (padrão: $GRAFO_CACHE_DIR)")
+    analisar.add_argument('--pesos', action='store_true',
+                          help="inclui a análise ponderada (árvore geradora mínima e diâmetro)")
+    analisar.add_argument('--fluxo', action='store_true',
+                          help="analisa os arquivos .csv/.txt em fluxo, sem carregá-los na memória "
+                               "(só as propriedades de conectividade, graus, ciclos e bipartição)")
+    servir = subcomandos.add_parser('serve', aliases=['servir'],
+                                    help="atende pedidos de análise em JSON (entrada padrão ou HTTP local)")
+    servir.add_argument('--http', type=int, default=None, metavar='PORTA',
+                        help="serve por HTTP nesta porta em vez da entrada padrão")
+    servir.add_argument('--host', default='127.0.0.1', help="endereço do serviço HTTP (padrão: 127.0.0.1)")
+    servir.add_argument('--jobs', '-j', type=int, default=TRABALHADORES_PADRAO,
+                        help=f"número de análises simultâneas (padrão: {TRABALHADORES_PADRAO})")
+    servir.add_argument('--cache', default=os.environ.get('GRAFO_CACHE_DIR'),
+                        help="diretório do cache de resultados em disco (padrão: $GRAFO_CACHE_DIR)")
+    args = parser.parse_args(argv)
+    if args.instrumentar is not None:
+        configurar_instrumentacao(args.instrumentar)
+
+    if args.comando is None:
+        criar_grafo()
+        # Tarefas ainda em execução são canceladas ao sair do menu
+        if _servidor_menu is not None:
+            _servidor_menu.encerrar()
+        # No menu interativo o resumo das etapas sai ao final, na saída de erro
+        if instrumentacao.ativa:
+            exibir_instrumentacao(instrumentacao.resumo())
+        return 0
+    if args.comando in ('serve', 'servir'):
+        if args.cache:
+            configurar_cache(diretorio=args.cache)
+        servidor = ServidorTarefas(args.jobs)
+        try:
+            if args.http is not None:
+                servir_http(servidor, args.host, args.http)
+            else:
+                servir_stdin(servidor)
+        finally:
+            servidor.encerrar()
+        if instrumentacao.ativa:
+            exibir_instrumentacao(instrumentacao.resumo())
+        return 0
+    if args.fluxo and args.pesos:
+        parser.error("--pesos precisa do grafo carregado e não pode ser usado com --fluxo")
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as saida:
+            falhas = analisar_em_lote(args.arquivos, args.jobs, args.timeout, saida, args.cache,
+                                      args.pesos, args.fluxo)
+    else:
+        falhas = analisar_em_lote(args.arquivos, args.jobs, args.timeout, diretorio_cache=args.cache,
+                                  pesos=args.pesos, fluxo=args.fluxo)
+    return 1 if falhas else 0
+
+
 if __name__ == "__main__":
-    # Inicia a execução do programa ao chamar a função criar_grafo()
-    criar_grafo()
\ No newline at end of file
+    # Sem argumentos inicia o menu interativo (criar_grafo); com "analyze" roda o modo em lote
+    # e com "serve" atende pedidos de análise em JSON
+    sys.exit(main())